@@ -1,8 +1,10 @@
 import streamlit as st
-import json
+import orjson
 import pandas as pd
+import numpy as np
 import os
-import time
+import uuid
+from string import Template
 from datetime import datetime
 
 # Set page configuration
@@ -13,86 +15,181 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Function to get a file's modification time (0 if it doesn't exist)
+def file_mtime(path):
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+
+# Read a CSS file once per file version (the modification time only keys the cache,
+# so editing the file picks up the new styles without a restart)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_css(css_file, mtime):
+    with open(css_file, "r") as f:
+        return f.read()
+
 # Load external CSS
 def load_css(css_file):
-    with open(css_file, "r") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    st.markdown(f"<style>{get_css(css_file, file_mtime(css_file))}</style>", unsafe_allow_html=True)
 
 # Load CSS
 load_css("styles.css")
 
-# Function to get confidence class based on confidence score
-def get_confidence_class(confidence):
-    if confidence >= 70:
-        return "confidence-high"
-    elif confidence >= 40:
-        return "confidence-medium"
-    elif confidence > 0:
-        return "confidence-low"
-    else:
-        return "confidence-none"
+# HTML templates (the styling for them lives in styles.css)
+FILTER_SUMMARY_TEMPLATE = Template("""
+<div class="filter-section">
+    <b>Current View:</b> $count articles 
+</div>
+""")
+
+PAGE_SIZE = 25  # Articles shown per page of the grid
 
 # Function to analyze article
 def analyze_article(article):
-    # Display a progress indicator
-    progress_placeholder = st.empty()
-    progress_bar = progress_placeholder.progress(0)
-    
-    # Simulate backend processing with progress updates
-    for i in range(101):
-        # Update progress bar
-        progress_bar.progress(i)
-        if i < 100:
-            time.sleep(0.01)  # Simulate processing time
-    
-    # In a real implementation, this would call your backend service
-    # For example: response = requests.post('your-backend-url/analyze', json=article)
-    new_excerpt = f"{article["excerpt"]} - AI analysis complete"
-    # Simulate a successful analysis with updated data
-    # In reality, this would be the response from your backend
-    analysis_result = {
-        "confidence": min(article["confidence"] + 15, 100),  # Increase confidence (max 100)
-        "company": article["company"] if article["company"] else "Detected Company",
-        "location": article["location"] if article["location"] else "Detected Location",
-        "excerpt": new_excerpt
-    }
+    # Show an indeterminate spinner while the analysis runs (it clears itself).
+    # If the backend reports real progress, drive a progress bar from that instead.
+    with st.spinner("Analyzing..."):
+        # In a real implementation, this would call your backend service
+        # For example: response = requests.post('your-backend-url/analyze', json=article)
+        new_excerpt = f"{article['excerpt']} - AI analysis complete"
+        # Simulate a successful analysis with updated data
+        # In reality, this would be the response from your backend
+        analysis_result = {
+            "confidence": min(article["confidence"] + 15, 100),  # Increase confidence (max 100)
+            "company": article["company"] if article["company"] else "Detected Company",
+            "location": article["location"] if article["location"] else "Detected Location",
+            "excerpt": new_excerpt
+        }
     
-    # Update the article with analysis results
-    for key, value in analysis_result.items():
-        article[key] = value
+    # Build the analyzed article as a new dict rather than mutating the original
+    analyzed_article = dict(article)
+    analyzed_article.update(analysis_result)
     
     # Update the article in the session state data
-    for i, art in enumerate(st.session_state.data):
-        if art["articleID"] == article["articleID"]:
-            st.session_state.data[i] = article
-            break
-    
-    # Clean up the progress bar
-    progress_placeholder.empty()
+    st.session_state.data[st.session_state.id_to_idx[article["articleID"]]] = analyzed_article
+    st.session_state.dirty_ids.add(article["articleID"])
     
     return True
 
-# Function to load data
-@st.cache_data
-def load_data():
+# Data files: the full article list, and an append-only log of the articles
+# changed since the full list was last written
+DATA_FILE = 'article-confidence.json'
+CHANGES_FILE = 'article-confidence.changes.jsonl'
+
+# Function to load data. The modification times are only there to key the cache,
+# so any change to either file on disk loads it again.
+@st.cache_data(max_entries=4)
+def load_data(path, mtime, changes_path, changes_mtime):
     try:
-        with open('article-confidence.json', 'r') as file:
-            return json.load(file)
+        with open(path, 'rb') as file:
+            data = orjson.loads(file.read())
     except FileNotFoundError:
-        st.error("File 'article-confidence.json' not found.")
+        st.error(f"File '{path}' not found.")
         return []
+    # Replay the change log over the full list (the last logged copy of an article wins)
+    if os.path.exists(changes_path):
+        positions = {article["articleID"]: i for i, article in enumerate(data)}
+        with open(changes_path, 'rb') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                article = orjson.loads(line)
+                if article["articleID"] in positions:
+                    data[positions[article["articleID"]]] = article
+                else:
+                    positions[article["articleID"]] = len(data)
+                    data.append(article)
+    return data
 
 # Function to save data
 def save_data(data):
-    with open('article-confidence.json', 'w') as file:
-        json.dump(data, file, indent=2)
+    # Only the articles changed since the last save are written, appended to the change log
+    # (looked up by position, in list order, rather than scanning the whole list)
+    dirty_articles = [data[position] for position in sorted(st.session_state.id_to_idx[article_id] for article_id in st.session_state.dirty_ids if article_id in st.session_state.id_to_idx)]
+    if dirty_articles:
+        with open(CHANGES_FILE, 'ab') as file:
+            file.write(b"".join(orjson.dumps(article, option=orjson.OPT_NON_STR_KEYS) + b"\n" for article in dirty_articles))
+    # Compact once the log has grown as large as the full list: rewrite the list and drop the log
+    # (through a temporary file and a rename, so an interrupted write never truncates the list,
+    # and the log is only dropped once the new list is in place)
+    if not os.path.exists(DATA_FILE) or (os.path.exists(CHANGES_FILE) and os.path.getsize(CHANGES_FILE) >= os.path.getsize(DATA_FILE)):
+        temp_file = DATA_FILE + '.tmp'
+        with open(temp_file, 'wb') as file:
+            file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        os.replace(temp_file, DATA_FILE)
+        if os.path.exists(CHANGES_FILE):
+            os.remove(CHANGES_FILE)
+    st.session_state.dirty_ids = set()
     #st.success("Complete!")
     st.session_state.data = data
+    index_data()
+    bump_data_version()
     return data
 
+# Function to map each article ID to its position in the session data
+def index_data():
+    st.session_state.id_to_idx = {article["articleID"]: i for i, article in enumerate(st.session_state.data)}
+
+# Function to mark the session data as changed so derived frames are rebuilt
+def bump_data_version():
+    st.session_state.data_version = uuid.uuid4().hex
+
+# Article fields edited as numbers in the grid (the rest are text)
+NUMERIC_FIELDS = {"confidence"}
+
+# Function to apply edits made in the article editor to the session data
+def apply_article_edits(editor_key, positions):
+    edited_rows = st.session_state[editor_key]["edited_rows"]
+    for row, changes in edited_rows.items():
+        article = st.session_state.data[positions[row]]
+        # The analyze column only tracks the selection, it isn't article data
+        if "analyze" in changes:
+            if changes.pop("analyze"):
+                st.session_state.selected_ids.add(article["articleID"])
+            else:
+                st.session_state.selected_ids.discard(article["articleID"])
+        if changes:
+            st.session_state.dirty_ids.add(article["articleID"])
+        for key, value in changes.items():
+            # A cleared cell arrives as None: numeric fields fall back to 0, text fields to ""
+            if value is None:
+                value = 0 if key in NUMERIC_FIELDS else ""
+            article[key] = value
+    # A new data version also gives the editor a fresh key, so pending row edits
+    # never get re-applied to a different row after the frame is re-sorted
+    bump_data_version()
+
+# Function to build the filter/sort columns for a version of the session data.
+# Each field is one numpy array aligned with the positions in the session data
+# (a structure of arrays), so filtering and sorting are vectorized.
+@st.cache_data(max_entries=32)
+def get_article_columns(data_version, _data):
+    return {
+        # Searchable fields combined into one lowercase blob (newline separated
+        # so a search term can't match across two fields)
+        "search_text": np.array([
+            "\n".join((article["title"].lower(), article["company"].lower(), article["location"].lower(),
+                       article["date"], article["excerpt"].lower()))
+            for article in _data
+        ], dtype=str),
+        "confidence": np.array([article["confidence"] for article in _data], dtype=np.int16),
+        # Blank values sort as "zzz", matching the previous list sort
+        "title": np.array([article["title"] or "zzz" for article in _data], dtype=str),
+        "company": np.array([article["company"] or "zzz" for article in _data], dtype=str),
+        "date": np.array([article["date"] or "zzz" for article in _data], dtype=str),
+    }
+
+# Function to get a stable sort order (descending keeps ties in their original order)
+def stable_order(keys, descending):
+    if not descending:
+        return np.argsort(keys, kind="stable")
+    return len(keys) - 1 - np.argsort(keys[::-1], kind="stable")[::-1]
+
 # Initialize session state variables
 if 'data' not in st.session_state:
-    st.session_state.data = load_data()
+    st.session_state.data = load_data(DATA_FILE, file_mtime(DATA_FILE), CHANGES_FILE, file_mtime(CHANGES_FILE))
+if 'id_to_idx' not in st.session_state:
+    index_data()
+if 'data_version' not in st.session_state:
+    bump_data_version()
 if 'filter_confidence' not in st.session_state:
     st.session_state.filter_confidence = "All"
 if 'search_term' not in st.session_state:
@@ -101,22 +198,12 @@ if 'sort_by' not in st.session_state:
     st.session_state.sort_by = "confidence"
 if 'sort_order' not in st.session_state:
     st.session_state.sort_order = "descending"
-if 'analyzing' not in st.session_state:
-    st.session_state.analyzing = False
-if 'last_analyzed_id' not in st.session_state:
-    st.session_state.last_analyzed_id = None
+if 'selected_ids' not in st.session_state:
+    st.session_state.selected_ids = set()
+if 'dirty_ids' not in st.session_state:
+    st.session_state.dirty_ids = set()
 
 # Main application title
-st.markdown("""
-        <style>
-            .block-container {
-                    padding-top: 0.75rem;
-                    padding-bottom: 0rem;
-                    padding-left: 2rem;
-                    padding-right: 2rem;
-                }
-        </style>
-        """, unsafe_allow_html=True)
 st.image("assets/prospectorAIDE-logo.png", width=300)
 st.markdown('<div class="title">Article Confidence Review Tool</div>', unsafe_allow_html=True)
 
@@ -160,104 +247,88 @@ with st.sidebar:
         st.rerun()
 
 # Filter and sort data
-filtered_data = st.session_state.data.copy()
+columns = get_article_columns(st.session_state.data_version, st.session_state.data)
+confidence = columns["confidence"]
+mask = np.ones(len(confidence), dtype=bool)
 
 # Apply search filter
 if st.session_state.search_term:
     search_term = st.session_state.search_term.lower()
-    filtered_data = [
-        article for article in filtered_data
-        if search_term in article["title"].lower() or 
-           search_term in article["company"].lower() or
-           search_term in article["location"].lower() or
-           search_term in article["date"] or
-           search_term in article["excerpt"].lower()
-    ]
+    mask &= np.char.find(columns["search_text"], search_term) >= 0
 
 # Apply confidence filter
-if st.session_state.filter_confidence != "All":
-    if st.session_state.filter_confidence == "High (70-100)":
-        filtered_data = [article for article in filtered_data if article["confidence"] >= 70]
-    elif st.session_state.filter_confidence == "Medium (40-69)":
-        filtered_data = [article for article in filtered_data if 40 <= article["confidence"] < 70]
-    elif st.session_state.filter_confidence == "Low (1-39)":
-        filtered_data = [article for article in filtered_data if 0 < article["confidence"] < 40]
-    elif st.session_state.filter_confidence == "None (0)":
-        filtered_data = [article for article in filtered_data if article["confidence"] == 0]
+if st.session_state.filter_confidence == "High (70-100)":
+    mask &= confidence >= 70
+elif st.session_state.filter_confidence == "Medium (40-69)":
+    mask &= (confidence >= 40) & (confidence < 70)
+elif st.session_state.filter_confidence == "Low (1-39)":
+    mask &= (confidence > 0) & (confidence < 40)
+elif st.session_state.filter_confidence == "None (0)":
+    mask &= confidence == 0
 
-# Sort data
+# Sort data, keeping only the positions that passed the filters
 reverse_order = st.session_state.sort_order == "descending"
-filtered_data = sorted(filtered_data, key=lambda x: x[st.session_state.sort_by] if x[st.session_state.sort_by] != "" else "zzz", reverse=reverse_order)
+order = stable_order(columns[st.session_state.sort_by], reverse_order)
+filtered_positions = order[mask[order]].tolist()
 
 # Display filter summary
-st.markdown(f"""
-<div class="filter-section">
-    <b>Current View:</b> {len(filtered_data)} articles 
-</div>
-""", unsafe_allow_html=True)
+st.html(FILTER_SUMMARY_TEMPLATE.substitute(count=len(filtered_positions)))
 
-# Create a container for messages
-message_container = st.container()
+# Function to render the editable article grid and its actions. Edits and
+# selections only rerun this fragment, not the load/filter/sort pipeline above.
+@st.fragment
+def render_articles(positions):
+    # Only one page of the grid is built and sent, so each rerun costs the same however
+    # many articles match
+    page_count = (len(positions) + PAGE_SIZE - 1) // PAGE_SIZE
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+        positions = positions[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
 
-# Display articles
-for idx, article in enumerate(filtered_data):
-    confidence_class = get_confidence_class(article["confidence"])
-    
-    # Create a unique key for each article form
-    form_key = f"article_form_{article['articleID']}"
-    
-    with st.form(key=form_key):
-        # Display the title and excerpt (not editable)
-        st.markdown(f"""
-        <div class='article-card {confidence_class}'>
-            <div class='article-title'>{article['title']}</div>
-            <div class='article-excerpt'>{article['excerpt']}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Row for company, location, confidence
-        col1, col2, col3, col4, col5, btn_col = st.columns([2, 2, 2, 2, 1, 2], vertical_alignment="center")
-        
-        with col1:
-            article["company"] = st.text_input("Company", article["company"], key=f"company_{idx}")
-        
-        with col2:
-            article["location"] = st.text_input("Location", article["location"], key=f"location_{idx}")
-        
-        with col3:
-            article["date"] = st.text_input("Date", article["date"], key=f"date_{idx}")
-        
-        with col4:
-            article["confidence"] = st.number_input("Confidence", 0, 100, int(article["confidence"]), key=f"confidence_{idx}")
-        
-        with btn_col:
-            st.write("")
-            st.write("")
-            
-            analyze_button = st.form_submit_button("Analyze")
-            
-            if analyze_button:
-                # Set the article as being analyzed and store its ID
-                st.session_state.analyzing = True
-                st.session_state.last_analyzed_id = article['articleID']
-                
-                # Perform the analysis (this will update the article in st.session_state.data)
-                analyze_article(article)
-                
-                # Save the updated data to the JSON file
-                save_data(st.session_state.data)
+    editor_key = f"article_editor_{st.session_state.data_version}_{page}"
+    editor_columns = ["title", "excerpt", "company", "location", "date", "confidence", "url"]
+    # Build the grid from the live session data so edits show up on fragment reruns
+    visible_articles = [st.session_state.data[position] for position in positions]
+    editor_df = pd.DataFrame(visible_articles, columns=["articleID"] + editor_columns)
+    editor_df.insert(0, "analyze", editor_df.pop("articleID").isin(st.session_state.selected_ids))
+
+    st.data_editor(
+        editor_df,
+        key=editor_key,
+        on_change=apply_article_edits,
+        args=(editor_key, positions),
+        num_rows="fixed",
+        hide_index=True,
+        use_container_width=True,
+        disabled=["title", "excerpt", "url"],
+        column_config={
+            "analyze": st.column_config.CheckboxColumn("Analyze", default=False),
+            "title": st.column_config.TextColumn("Title"),
+            "excerpt": st.column_config.TextColumn("Excerpt"),
+            "company": st.column_config.TextColumn("Company"),
+            "location": st.column_config.TextColumn("Location"),
+            "date": st.column_config.TextColumn("Date"),
+            "confidence": st.column_config.NumberColumn("Confidence", min_value=0, max_value=100, step=1, format="%d", required=True),
+            "url": st.column_config.LinkColumn("URL"),
+        }
+    )
+
+    # Analyze the articles checked in the grid
+    selected_articles = [st.session_state.data[position] for position in sorted(st.session_state.id_to_idx[article_id] for article_id in st.session_state.selected_ids)]
+    if st.button(f"Analyze Selected ({len(selected_articles)})", type="primary", disabled=not selected_articles):
+        for article in selected_articles:
+            # Perform the analysis (this will update the article in st.session_state.data)
+            analyze_article(article)
         
-        st.markdown(f"""
-            <a href="{article['url']}" target="_blank" class="url-link">{article['url']}</a>
-            """, unsafe_allow_html=True)
-    
-    # Display a success message for the article that was just analyzed
-    if st.session_state.last_analyzed_id == article['articleID'] and st.session_state.analyzing:
-        with message_container:
-#            st.success(f"Analysis completed for article: {article['title']}")
-            # Reset the flags after showing the message
-            st.session_state.analyzing = False
-            st.session_state.last_analyzed_id = None
+        # Save the updated data to the JSON file
+        st.session_state.selected_ids = set()
+        save_data(st.session_state.data)
+        # Scores changed, so re-run the whole app to re-filter and re-sort
+        st.rerun()
+
+# Display articles
+render_articles(filtered_positions)
 
 # Add a footer
 st.markdown("""
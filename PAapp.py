@@ -1,16 +1,38 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime
 import time
 import re
 import json
+import orjson
 import uuid
+import hashlib
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+# The scraper's cached HTTP session is shared with the app (one cache file)
+from http_session import get_http_session
 
 # Constants - modify these as needed
-START_URL = 'https://chainstoreage.com/news'
+BASE_URL = 'https://chainstoreage.com'
+NEWS_URL = BASE_URL + '/news'
+START_URL = NEWS_URL
 CUTOFF_DATE = datetime(2025, 5, 1)  # Articles before this date will not be scraped
 OUTPUT_FILE = 'articles.json'
 
+# Compiled patterns for the article list scraper
+DATE_RE = re.compile(r'"date":"([^"]+)"')
+URL_DATE_RE = re.compile(r'/(\d{4}-\d{2})/')
+JSON_DECODER = json.JSONDecoder()
+
+# Namespace for article UUIDs (the DNS namespace)
+UUID_NAMESPACE_BYTES = uuid.UUID('6ba7b810-9dad-11d1-80b4-00c04fd430c8').bytes
+
+# Number of listing pages fetched concurrently
+PAGE_FETCH_WORKERS = 4
+
+# Only the tags the listing extractors read (cards, links, dated scripts and
+# the pagination list) are built into the tree when parsing a listing page
+LISTING_STRAINER = SoupStrainer(['div', 'a', 'script', 'ul'])
+
 def parse_date(date_string):
     """
     Parse a date string into a datetime object.
@@ -21,37 +43,23 @@ def parse_date(date_string):
     date_string = date_string.strip()
     
     try:
-        # Try ISO format (e.g., "2025-04-30T14:37:11")
+        # ISO format, with or without time or seconds (e.g., "2025-04-30T14:37:11",
+        # "2025-04-30T14:37" or "2025-04-30"), parsed by the C implementation
         return datetime.fromisoformat(date_string)
     except ValueError:
-        try:
-            # Try with variations of ISO format
-            return datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%S")
-        except ValueError:
-            try:
-                # Try without seconds
-                return datetime.strptime(date_string, "%Y-%m-%dT%H:%M")
-            except ValueError:
-                try:
-                    # Try with just the date
-                    return datetime.strptime(date_string, "%Y-%m-%d")
-                except ValueError:
-                    print(f"Could not parse date: {date_string}")
-                    return None
+        print(f"Could not parse date: {date_string}")
+        return None
 
-def fetch_and_parse_chainestoreage(url, parser='html.parser', extract_data=False):
+def fetch_and_parse_chainestoreage(url, parser='lxml', extract_data=False):
     """
     Fetches content from a URL and parses it using BeautifulSoup.
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_session().get(url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, parser)
+        # The full tree is only needed when the caller wants the soup itself
+        soup = BeautifulSoup(response.text, parser, parse_only=LISTING_STRAINER if extract_data else None)
         
         if not extract_data:
             return soup
@@ -69,11 +77,30 @@ def fetch_and_parse_chainestoreage(url, parser='html.parser', extract_data=False
         print(f"Error fetching or parsing URL: {e}")
         return None
 
+def find_script_date(date_scripts, article_id):
+    """
+    Find the date for an article in the pre-scanned script texts.
+    """
+    if not article_id:
+        return None
+    for script_text in date_scripts:
+        if article_id in script_text:
+            date_match = DATE_RE.search(script_text)
+            return date_match.group(1) if date_match else None
+    return None
+
 def extract_articles_chainstoreage(soup):
     """
     Extracts article information from the page.
     """
     articles = []
+    # Position of each collected title, so the duplicate checks below are dict
+    # lookups and later sources can fill in details for an article already found
+    title_index = {}
+    
+    # Scan the script tags once for the ones that carry dates, rather than
+    # walking every script on the page again for each article
+    date_scripts = [script.string for script in soup.find_all('script') if script.string and '"date":' in script.string]
     
     # Find all article containers - both card and teaser-card classes
     # First: Look for the main larger cards
@@ -87,7 +114,7 @@ def extract_articles_chainstoreage(soup):
             link = heading.find('a')
             if link:
                 article['title'] = link.text.strip()
-                article['url'] = 'https://chainstoreage.com' + link['href'] if link['href'].startswith('/') else link['href']
+                article['url'] = BASE_URL + link['href'] if link['href'].startswith('/') else link['href']
         
         # Extract excerpt
         body = card.find('div', class_='card__body')
@@ -98,7 +125,7 @@ def extract_articles_chainstoreage(soup):
         article_url = article.get('url', '')
         if article_url:
             # Extract date from the URL if possible
-            date_match = re.search(r'/(\d{4}-\d{2})/', article_url)
+            date_match = URL_DATE_RE.search(article_url)
             if date_match:
                 year_month = date_match.group(1)
                 # Set an approximate date for the article (first day of month)
@@ -110,17 +137,16 @@ def extract_articles_chainstoreage(soup):
             article_id = article['url'].split('/')[-1]
         
         # Extract date from article element content if available
-        date_elem = soup.find('script', string=lambda text: text and article_id and article_id in text and '"date":' in text)
-        if date_elem:
-            date_match = re.search(r'"date":"([^"]+)"', date_elem.string)
-            if date_match:
-                article['date'] = date_match.group(1)
+        script_date = find_script_date(date_scripts, article_id)
+        if script_date:
+            article['date'] = script_date
         
         # Special handling for Chipotle article we know about (example)
         if article.get('title') and "Chipotle" in article.get('title') and "Q1" in article.get('title'):
             article['date'] = "2025-04-24T00:00:00"
         
         if article and 'title' in article:
+            title_index[article['title']] = len(articles)
             articles.append(article)
     
     # Second: Look for the teaser cards
@@ -134,7 +160,7 @@ def extract_articles_chainstoreage(soup):
             link = heading.find_parent('a')
             if link:
                 article['title'] = heading.text.strip()
-                article['url'] = 'https://chainstoreage.com' + link['href'] if link['href'].startswith('/') else link['href']
+                article['url'] = BASE_URL + link['href'] if link['href'].startswith('/') else link['href']
         
         # Extract excerpt
         body = card.find('div', class_='teaser-card__body')
@@ -145,7 +171,7 @@ def extract_articles_chainstoreage(soup):
         article_url = article.get('url', '')
         if article_url:
             # Extract date from the URL if possible
-            date_match = re.search(r'/(\d{4}-\d{2})/', article_url)
+            date_match = URL_DATE_RE.search(article_url)
             if date_match:
                 year_month = date_match.group(1)
                 # Set an approximate date for the article (first day of month)
@@ -157,13 +183,12 @@ def extract_articles_chainstoreage(soup):
             article_id = article['url'].split('/')[-1]
         
         # Extract date from article element content if available
-        date_elem = soup.find('script', string=lambda text: text and article_id and article_id in text and '"date":' in text)
-        if date_elem:
-            date_match = re.search(r'"date":"([^"]+)"', date_elem.string)
-            if date_match:
-                article['date'] = date_match.group(1)
+        script_date = find_script_date(date_scripts, article_id)
+        if script_date:
+            article['date'] = script_date
         
-        if article and 'title' in article and not any(a.get('title') == article.get('title') for a in articles):
+        if article and 'title' in article and article['title'] not in title_index:
+            title_index[article['title']] = len(articles)
             articles.append(article)
     
     # Look for articles inside script tags with JSON content
@@ -171,26 +196,31 @@ def extract_articles_chainstoreage(soup):
     for script in scripts:
         if script.string and '"content":' in script.string and '"items":' in script.string:
             try:
-                content_match = re.search(r'"content":\s*({.+?})(?:,\s*"children":|\s*\})', script.string, re.DOTALL)
-                if content_match:
-                    content_str = content_match.group(1)
-                    content_str = re.sub(r',\s*}', '}', content_str)  # Fix trailing commas
-                    content_obj = json.loads(content_str)
+                # Decode the object that follows "content": in place, instead of
+                # regex-matching it out of the script body and parsing the copy
+                content_start = script.string.find('{', script.string.find('"content":'))
+                if content_start >= 0:
+                    content_obj, _ = JSON_DECODER.raw_decode(script.string, content_start)
                     
                     if 'items' in content_obj:
                         for item in content_obj['items']:
                             # Check if we already have this article
-                            if any(a.get('title') == item.get('title') for a in articles):
+                            if item.get('title') in title_index:
+                                # Fill in a date the card didn't carry
+                                existing = articles[title_index[item['title']]]
+                                if not existing.get('date') and item.get('date'):
+                                    existing['date'] = item['date']
                                 continue
                                 
                             article = {
                                 'title': item.get('title'),
                                 'excerpt': item.get('summary'),
-                                'url': 'https://chainstoreage.com' + item.get('url') if item.get('url', '').startswith('/') else item.get('url'),
+                                'url': BASE_URL + item.get('url') if item.get('url', '').startswith('/') else item.get('url'),
                                 'date': item.get('date')
                             }
                             
                             if article and 'title' in article and article['title']:
+                                title_index[article['title']] = len(articles)
                                 articles.append(article)
             except Exception as e:
                 print(f"Error parsing JSON from script tag: {e}")
@@ -223,7 +253,7 @@ def extract_pagination_chainstoreage(soup):
         
         if link.text.strip().isdigit():
             page_num = int(link.text.strip())
-            page_url = 'https://chainstoreage.com/news' + link['href'] if link['href'].startswith('?') else link['href']
+            page_url = NEWS_URL + link['href'] if link['href'].startswith('?') else link['href']
             
             pagination['pages'].append({
                 'number': page_num,
@@ -236,7 +266,7 @@ def extract_pagination_chainstoreage(soup):
         elif 'next' in item.get('class', []):
             if link.text.strip().lower() == 'next':
                 pagination['has_next'] = True
-                pagination['next_url'] = 'https://chainstoreage.com/news' + link['href'] if link['href'].startswith('?') else link['href']
+                pagination['next_url'] = NEWS_URL + link['href'] if link['href'].startswith('?') else link['href']
             elif link.text.strip().lower() == 'last':
                 if 'page=' in link['href']:
                     try:
@@ -247,76 +277,125 @@ def extract_pagination_chainstoreage(soup):
         elif 'prev' in item.get('class', []):
             if 'disabled' not in item.get('class', []):
                 pagination['has_prev'] = True
-                pagination['prev_url'] = 'https://chainstoreage.com/news' + link['href'] if link['href'].startswith('?') else link['href']
+                pagination['prev_url'] = NEWS_URL + link['href'] if link['href'].startswith('?') else link['href']
     
     return pagination
 
+def add_page_articles(articles, cutoff_date, all_articles):
+    """
+    Adds a page of articles to the collection.
+    Returns True once an article published before the cutoff date is reached.
+    """
+    for article in articles:
+        print(f"Processing article: {article.get('title', 'Unknown Title')}")
+        
+        # Check if the article has a date
+        article_date = None
+        
+        # Try to get the date from various sources
+        if 'date' in article and article['date']:
+            article_date = parse_date(article['date'])
+        elif 'date_from_url' in article and article['date_from_url']:
+            article_date = parse_date(article['date_from_url'])
+        
+        if article_date:
+            print(f"Article date: {article_date}")
+            
+            # If the article is before the cutoff date, stop scraping
+            if article_date < cutoff_date:
+                print(f"Reached cutoff date ({article_date} is before {cutoff_date})")
+                # Still add this article to complete the collection
+                all_articles.append(article)
+                return True
+        else:
+            print(f"No date found for article: {article.get('title', 'Unknown Title')}")
+        
+        # Add the article to our collection
+        all_articles.append(article)
+    
+    return False
+
+def process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
+    """
+    Adds the articles from a fetched page to the collection.
+    Returns True when scraping should stop.
+    """
+    if not data:
+        print(f"Failed to fetch or parse page {page_count}")
+        return True
+    
+    articles = data['articles']
+    if not articles:
+        print(f"No articles found on page {page_count}")
+        return True
+    print(f"Found {len(articles)} articles on page {page_count}")
+    
+    # If we've reached the cutoff, stop scraping
+    return add_page_articles(articles, cutoff_date, all_articles)
+
+def build_page_url(url, page_number):
+    """
+    Returns the URL with its 'page' query parameter set to page_number.
+    """
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query))
+    query['page'] = str(page_number)
+    return urlunparse(parts._replace(query=urlencode(query)))
+
 def scrape_articles_chainstoreage(start_url, cutoff_date):
     """
     Scrapes articles until finding one published before the cutoff date.
     """
     all_articles = []
-    current_url = start_url
     page_count = 1
-    reached_cutoff = False
+    print(f"Scraping page {page_count}: {start_url}")
+    data = fetch_and_parse_chainestoreage(start_url, extract_data=True)
+    if process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
+        return all_articles
     
-    while current_url and not reached_cutoff:
-        print(f"Scraping page {page_count}: {current_url}")
-        
-        data = fetch_and_parse_chainestoreage(current_url, extract_data=True)
-        if not data:
-            print(f"Failed to fetch or parse page {page_count}")
-            break
-            
-        articles = data['articles']
-        pagination = data['pagination']
-        
-        if not articles:
-            print(f"No articles found on page {page_count}")
-            break
-            
-        print(f"Found {len(articles)} articles on page {page_count}")
-        
-        # Process articles on this page
-        for article in articles:
-            print(f"Processing article: {article.get('title', 'Unknown Title')}")
-            
-            # Check if the article has a date
-            article_date = None
-            
-            # Try to get the date from various sources
-            if 'date' in article and article['date']:
-                article_date = parse_date(article['date'])
-            elif 'date_from_url' in article and article['date_from_url']:
-                article_date = parse_date(article['date_from_url'])
-            
-            if article_date:
-                print(f"Article date: {article_date}")
+    pagination = data['pagination']
+    if not (pagination['has_next'] and pagination['next_url']):
+        print("No more pages to scrape.")
+        return all_articles
+    
+    # When the last page is known, fetch the following pages a window at a time
+    # on a thread pool so their round trips overlap. The pages are still added
+    # in order, and nothing past the window holding the cutoff is requested.
+    next_page = dict(parse_qsl(urlparse(pagination['next_url']).query)).get('page', '')
+    if pagination['total_pages'] and next_page.isdigit():
+        page_urls = [build_page_url(pagination['next_url'], page_number)
+                     for page_number in range(int(next_page), pagination['total_pages'] + 1)]
+        with ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS) as executor:
+            for start in range(0, len(page_urls), PAGE_FETCH_WORKERS):
+                window = page_urls[start:start + PAGE_FETCH_WORKERS]
+                pages = executor.map(lambda url: fetch_and_parse_chainestoreage(url, extract_data=True), window)
+                for data in pages:
+                    page_count += 1
+                    if process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
+                        return all_articles
                 
-                # If the article is before the cutoff date, stop scraping
-                if article_date < cutoff_date:
-                    print(f"Reached cutoff date ({article_date} is before {cutoff_date})")
-                    reached_cutoff = True
-                    # Still add this article to complete the collection
-                    all_articles.append(article)
-                    break
-            else:
-                print(f"No date found for article: {article.get('title', 'Unknown Title')}")
-            
-            # Add the article to our collection
-            all_articles.append(article)
+                # Add a delay between windows to be respectful to the server
+                time.sleep(2)
         
-        # If we've reached the cutoff, stop scraping
-        if reached_cutoff:
+        print("No more pages to scrape.")
+        return all_articles
+    
+    # Otherwise follow the next page links one at a time
+    current_url = pagination['next_url']
+    while current_url:
+        page_count += 1
+        
+        # Add a delay to be respectful to the server
+        time.sleep(2)
+        print(f"Scraping page {page_count}: {current_url}")
+        data = fetch_and_parse_chainestoreage(current_url, extract_data=True)
+        if process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
             break
         
         # Get the next page URL from pagination
+        pagination = data['pagination']
         if pagination['has_next'] and pagination['next_url']:
             current_url = pagination['next_url']
-            page_count += 1
-            
-            # Add a delay to be respectful to the server
-            time.sleep(2)
         else:
             print("No more pages to scrape.")
             current_url = None
@@ -328,11 +407,12 @@ def generate_deterministic_uuid(url):
     Generate a deterministic UUID based on the article URL.
     This ensures the same article always gets the same UUID.
     """
-    # Create a UUID namespace (using the DNS namespace)
-    namespace = uuid.UUID('6ba7b810-9dad-11d1-80b4-00c04fd430c8')
-    
-    # Create a UUID from the URL
-    return str(uuid.uuid5(namespace, url))
+    # Same result as uuid.uuid5(NAMESPACE_DNS, url), hashing directly against
+    # the pre-computed namespace bytes
+    digest = bytearray(hashlib.sha1(UUID_NAMESPACE_BYTES + url.encode('utf-8')).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50
+    digest[8] = (digest[8] & 0x3F) | 0x80
+    return str(uuid.UUID(bytes=bytes(digest)))
 
 def main():
     """Main function to run the scraper."""
@@ -371,8 +451,8 @@ def main():
         clean_articles.append(clean_article)
     
     # Save to JSON file
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(clean_articles, f, indent=2, ensure_ascii=False)
+    with open(OUTPUT_FILE, 'wb') as f:
+        f.write(orjson.dumps(clean_articles, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     print(f"Results saved to {OUTPUT_FILE}")
 
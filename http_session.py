@@ -0,0 +1,23 @@
+import threading
+from requests_cache import CachedSession
+
+# SQLite file (chainstoreage_cache.sqlite in the app directory) for cached scraper responses
+HTTP_CACHE_NAME = 'chainstoreage_cache'
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Return the shared scraper HTTP session, creating it (and opening its cache) on first use."""
+    # Page requests reuse pooled keep-alive connections. Every request goes to the site, since
+    # listings shift between pages as articles are posted; the last copy of each page is kept
+    # in SQLite only as a fallback when the site errors (a zero expiry would store nothing, so
+    # responses expire after one second instead).
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = CachedSession(HTTP_CACHE_NAME, expire_after=1, stale_if_error=True)
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            })
+            _http_session = session
+    return _http_session
@@ -2,32 +2,15 @@ import streamlit as st
 import os
 import sys
 
-# Add pages directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), "pages"))
+# Add pages directory to path (only once, not on every rerun)
+_pages_dir = os.path.join(os.path.dirname(__file__), "pages")
+if _pages_dir not in sys.path:
+    sys.path.append(_pages_dir)
+from utils import count_articles_cached, render_header
 
-# Set page config
-st.set_page_config(
-    page_title="prospectorAIDE",
-    page_icon="⚒️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-st.logo("assets/prospectorAIDE-logo.png", size='large')
-
-# Create a container for logos in the header
-header = st.container()
-with header:
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        # App title
-        st.title("Lead Prospecting Tool", anchor=False)
-    
-    with col2:
-        # Company logo
-        if os.path.exists("assets/CtiPath-logo.png"):
-            st.image("assets/CtiPath-logo.png", width=150)
+# Set page config and header
+render_header("Lead Prospecting Tool", "⚒️", page_title="prospectorAIDE",
+              heading="Lead Prospecting Tool", sidebar="expanded", css_file=None)
 
 # Main page content
 st.markdown("""
@@ -48,16 +31,10 @@ Click on <a href="/Surveying" target="_self">**Surveying**</a> in the sidebar to
 
 # Display some stats if available
 try:
-    import json
-    import os.path
-    
-    # Function to count articles in a file
+    # Function to count articles in a file (distinct articleIDs, from the cached index
+    # of the file's current version)
     def count_articles(file_path):
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                return len(data)
-        return 0
+        return count_articles_cached(file_path)
     
     # Get counts
     all_articles = count_articles('article-confidence.json')
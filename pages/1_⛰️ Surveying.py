@@ -1,12 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 import sys
 from datetime import datetime, timedelta
 
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils import load_json_file, save_json_file, find_articles_chainstoreage, review_articles, get_articles_df
+# Add parent directory to path to import utils (only once, not on every rerun)
+_parent = os.path.dirname(os.path.dirname(__file__))
+if _parent not in sys.path:
+    sys.path.insert(0, _parent)
+from utils import get_articles_listing, read_articles, file_signature, save_jsonl_append, import_json_articles, find_articles_chainstoreage, review_articles, get_articles_soa, render_header, get_compatibility_emoji
 
 # Initialize session state variables
 if 'process_started' not in st.session_state:
@@ -25,97 +28,84 @@ def reset_processing():
     st.session_state.process_complete = False
     st.rerun()
 
-# Page configuration
-st.set_page_config(
-    page_title="prospectorAIDE - Surveying",
-    page_icon="⛰️",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
-st.logo("assets/prospectorAIDE-logo.png", size='large')
-
-# Load external CSS file
-def load_css(css_file):
-    if os.path.exists(css_file):
-        with open(css_file, "r") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    else:
-        st.warning(f"CSS file not found: {css_file}")
-
-# Load the CSS
-load_css("styles.css")
-
-# Create a container for logos in the header
-header = st.container()
-with header:
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        # App title
-        st.title("⛰️ Surveying", anchor=False)
-    
-    with col2:
-        # Company logo
-        if os.path.exists("assets/CtiPath-logo.png"):
-            st.image("assets/CtiPath-logo.png", width=150)
+# Page configuration and header
+render_header("Surveying", "⛰️")
 
 st.markdown("Gather and initial review of potential prospects.")
 
 # Constants
-PROSPECTS_FILE = "data/prospects-new.json"
+PROSPECTS_FILE = "data/prospects-new.jsonl"
+LEGACY_PROSPECTS_FILE = "data/prospects-new.json"  # Saved by earlier versions, before JSONL
 START_URL = 'https://chainstoreage.com/news'
+PAGE_SIZE = 25  # Prospects rendered per page of the list
+# Filter and sort choices (fixed, so built once rather than on every rerun)
+DATE_OPTIONS = ('All', 'Today', 'Yesterday', 'Last 7 days')
+SORT_OPTIONS = ('Date (newest first)', 'Date (oldest first)',
+                'compatibility (highest first)', 'compatibility (lowest first)')
 
 # Calculate yesterday's date
 yesterday = datetime.now() - timedelta(days=1)
 if 'default_cutoff_date' not in st.session_state:
     st.default_cutoff_date = yesterday.date()  
 
-# Load data
-@st.cache_data(ttl=10)  # Cache with a short time-to-live to allow refreshing
+# Bring in the prospects saved by earlier versions (only while there is no JSONL file yet)
+import_json_articles(LEGACY_PROSPECTS_FILE, PROSPECTS_FILE)
+
+# Load data: only the fields the statistics, filters and sorting use, plus each
+# article's position in the file so the rendered rows can be read on demand. Both are
+# shared by reference across reruns and only rebuilt when the file changes on disk.
+# The file signature is returned too, so the views cached on it match this listing.
 def load_data():
     try:
-        articles = load_json_file(PROSPECTS_FILE)
-        # If articles is a list of dictionaries, convert to list and extract 'articleID'
-        if articles and isinstance(articles, list) and 'articleID' in articles[0]:
-            # Make sure each article has an index based on its position
-            for i, article in enumerate(articles):
-                article['index'] = i
-            return articles
-        return []
+        file_version = file_signature(PROSPECTS_FILE)
+        return file_version, *get_articles_listing(PROSPECTS_FILE, *file_version)
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        return []
+        return None, [], {}
 
-articles = load_data()
+# Column-per-field view of the prospects for the statistics, filters and sorting
+# (cached per file version)
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_prospects_soa(file_version, _listing):
+    return get_articles_soa(_listing)
+
+# Count the articles in each compatibility bucket in one vectorized pass
+def get_compatibility_counts(compatibility):
+    return {
+        80: int((compatibility >= 80).sum()),
+        60: int(((compatibility >= 60) & (compatibility < 80)).sum()),
+        40: int(((compatibility >= 40) & (compatibility < 60)).sum()),
+    }
+
+file_version, listing, offsets = load_data()
+df = get_prospects_soa(file_version, listing)
 
 # Display message if no articles loaded
-if not articles:
+if not listing:
     st.warning(f"No prospects data found. Please Load/Review Prospects, or check that the file exists and contains valid data.")
 else:
     # Display statistics
     st.subheader("📊 Statistics", anchor=False)
+    compatibility_counts = get_compatibility_counts(df['compatibility'].to_numpy())
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("Total Prospects", len(articles))
+        st.metric("Total Prospects", len(listing))
 
     with col2:
         # Count articles with compatibility > 80
-        compatibility_80_count = sum(1 for a in articles if a.get('compatibility', 0) >= 80)
-        st.metric("🟢 Compatibility (80-100%)", f"{compatibility_80_count}/{len(articles)}")
+        compatibility_80_count = compatibility_counts[80]
+        st.metric("🟢 Compatibility (80-100%)", f"{compatibility_80_count}/{len(listing)}")
 
     with col3:
         # Count articles with compatibility > 60
-        compatibility_60_count = sum(1 for a in articles if a.get('compatibility', 0) >= 60 and a.get('compatibility', 0) < 80)
-        st.metric("🔵 Compatibility (60-79%)", f"{compatibility_60_count}/{len(articles)}")
+        compatibility_60_count = compatibility_counts[60]
+        st.metric("🔵 Compatibility (60-79%)", f"{compatibility_60_count}/{len(listing)}")
 
     with col4:
         # Count articles with compatibility > 40
-        compatibility_40_count = sum(1 for a in articles if a.get('compatibility', 0) >= 40 and a.get('compatibility', 0) < 60)
-        st.metric("🟡 Compatibility (40-59%)", f"{compatibility_40_count}/{len(articles)}")
-
-# Convert to DataFrame
-df = get_articles_df(articles)
+        compatibility_40_count = compatibility_counts[40]
+        st.metric("🟡 Compatibility (40-59%)", f"{compatibility_40_count}/{len(listing)}")
 
 # Single column declaration
 col1, col2 = st.columns(2)
@@ -151,17 +141,20 @@ if st.session_state.process_started and not st.session_state.process_complete:
             loaded_articles = find_articles_chainstoreage(START_URL, cutoff_datetime)
         
         with st.spinner("Reviewing new prospects..."):
-            reviewed_articles = review_articles(loaded_articles)
+            # Batches are reviewed concurrently, so advance the bar as each one finishes
+            review_progress = st.progress(0.0)
+            reviewed_articles = review_articles(
+                loaded_articles,
+                on_progress=lambda done, total: review_progress.progress(done / total))
+            review_progress.empty()
 
         with st.spinner("Saving prospects to file..."):
-            # Save back to file
-            save_json_file(reviewed_articles, PROSPECTS_FILE)
+            # Append to the file (a re-reviewed prospect replaces its earlier line when loaded)
+            save_jsonl_append(reviewed_articles, PROSPECTS_FILE)
             # Store count for success message
             st.session_state.loaded_articles_count = len(loaded_articles)
-            # Mark as complete
+            # Mark as complete (the appended file is picked up by its new modification time)
             st.session_state.process_complete = True
-            # Clear cache to reload data
-            st.cache_data.clear()
     
     # Force a rerun to refresh the page and show the success message
     st.rerun()
@@ -172,143 +165,143 @@ if st.session_state.process_complete:
     # Add a button to reset the process state
     reset_processing()
 
-# Filtering and sorting options
-st.subheader("Filter and Sort Prospects", anchor=False)
-col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+# Build each row's metadata line (compatibility, date, company, location) with column-wide
+# string operations, rather than joining the parts article by article
+def get_metadata_html(page_df):
+    metadata = "<strong>Compatibility: " + page_df['compatibility'].astype(str) + "%</strong>"
+    date_str = page_df['date_str']
+    metadata += (" | Date: " + date_str.fillna('')).where(date_str.notna(), '')
+    company = page_df['company'].astype(object).fillna('').astype(str)
+    metadata += (" | Company: " + company).where(company != '', '')
+    location = page_df['location']
+    metadata += (" | Location: " + location).where(location != '', '')
+    return "<div class='article-metadata'>" + metadata + "</div>"
+
+# Function to render the filters and the prospect list. Changing a filter, the sort
+# or the page only reruns this fragment, not the file load and statistics above.
+@st.fragment
+def render_prospects(df, offsets):
+    # Filtering and sorting options
+    st.subheader("Filter and Sort Prospects", anchor=False)
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
 
-with col1:
-    # Filter by company
-    if 'company' in df.columns and not df.empty:
-        companies = ['All'] + sorted(df['company'].unique().tolist())
-        selected_company = st.selectbox("Company", companies)
-    else:
-        selected_company = "All"
+    with col1:
+        # Filter by company
+        if 'company' in df.columns and not df.empty:
+            companies = ['All'] + df['company'].cat.categories.tolist()
+            selected_company = st.selectbox("Company", companies)
+        else:
+            selected_company = "All"
 
-with col2:
-    # Filter by compatibility score
-    min_compatibility = st.slider("Minimum compatibility", 0, 100, 0)
-
-with col3:
-    # Filter by date
-    if 'date' in df.columns and not df.empty:
-        date_options = ['All', 'Today', 'Yesterday', 'Last 7 days']
-        date_filter = st.selectbox("Date", date_options)
-    else:
-        date_filter = "All"
+    with col2:
+        # Filter by compatibility score
+        min_compatibility = st.slider("Minimum compatibility", 0, 100, 0)
+
+    with col3:
+        # Filter by date
+        if 'date' in df.columns and not df.empty:
+            date_filter = st.selectbox("Date", DATE_OPTIONS)
+        else:
+            date_filter = "All"
 
-with col4:
-    # Sorting options
-    sort_options = ['Date (newest first)', 'Date (oldest first)', 
-                   'compatibility (highest first)', 'compatibility (lowest first)']
-    sort_selection = st.selectbox("Sort By", sort_options)
+    with col4:
+        # Sorting options
+        sort_selection = st.selectbox("Sort By", SORT_OPTIONS)
 
-# Apply filters
-if not df.empty:
-    filtered_df = df.copy()
+    # Apply filters (combined into one mask, so only one filtered frame is built)
+    if not df.empty:
+        mask = np.ones(len(df), dtype=bool)
     
-    # Company filter
-    if selected_company != "All" and 'company' in df.columns:
-        filtered_df = filtered_df[filtered_df['company'] == selected_company]
+        # Company filter
+        if selected_company != "All" and 'company' in df.columns:
+            mask &= (df['company'] == selected_company).to_numpy()
     
-    # compatibility filter
-    if 'compatibility' in df.columns:
-        filtered_df = filtered_df[filtered_df['compatibility'] >= min_compatibility]
+        # compatibility filter
+        if 'compatibility' in df.columns:
+            mask &= (df['compatibility'] >= min_compatibility).to_numpy()
     
-    # Date filter
-    if date_filter != "All" and 'date' in df.columns:
-        today = pd.Timestamp.now().floor('D')
-        if date_filter == "Today":
-            filtered_df = filtered_df[filtered_df['date'].dt.date == today.date()]
-        elif date_filter == "Yesterday":
-            yesterday = today - pd.Timedelta(days=1)
-            filtered_df = filtered_df[filtered_df['date'].dt.date == yesterday.date()]
-        elif date_filter == "Last 7 days":
-            last_week = today - pd.Timedelta(days=7)
-            filtered_df = filtered_df[filtered_df['date'] >= last_week]
+        # Date filter
+        if date_filter != "All" and 'date' in df.columns:
+            today = pd.Timestamp.now().floor('D')
+            date_day = df['date_day'].to_numpy()
+            if date_filter == "Today":
+                mask &= date_day == np.datetime64(today.date(), 'D')
+            elif date_filter == "Yesterday":
+                yesterday = today - pd.Timedelta(days=1)
+                mask &= date_day == np.datetime64(yesterday.date(), 'D')
+            elif date_filter == "Last 7 days":
+                last_week = today - pd.Timedelta(days=7)
+                mask &= (df['date'] >= last_week).to_numpy()
     
-    # Apply sorting
-    if 'date' in filtered_df.columns and 'compatibility' in filtered_df.columns:
-        if sort_selection == 'Date (newest first)':
-            filtered_df = filtered_df.sort_values('date', ascending=False)
-        elif sort_selection == 'Date (oldest first)':
-            filtered_df = filtered_df.sort_values('date', ascending=True)
-        elif sort_selection == 'compatibility (highest first)':
-            filtered_df = filtered_df.sort_values('compatibility', ascending=False)
-        elif sort_selection == 'compatibility (lowest first)':
-            filtered_df = filtered_df.sort_values('compatibility', ascending=True)
-else:
-    filtered_df = pd.DataFrame()
-
-# Display data
-if not filtered_df.empty:
-    st.markdown(f"<div class='article-header'><strong>Prospect List</strong> ({len(filtered_df)} matching)</div>", unsafe_allow_html=True)
-
-    # Create a compact list of articles with minimal spacing
-    for idx, row in filtered_df.iterrows():
-        article_id = row.get('articleID')
-        article = next((a for a in articles if a.get('articleID') == article_id), None)
-        
-        if article:
-            # Use a 2-column layout: Article Content | Action Buttons
-            cols = st.columns([6, 1])
-            
-            with cols[0]:
-                # Title
-                if article['compatibility'] >= 80:
-                    compatibility_emoji = "🟢"
-                elif article['compatibility'] >= 60:
-                    compatibility_emoji = "🔵"
-                elif article['compatibility'] >= 40:
-                    compatibility_emoji = "🟡"
-                elif article['compatibility'] >= 20:
-                    compatibility_emoji = "🔴"
-                else:
-                    compatibility_emoji = "⚫"
-
-                st.markdown(f"<div class='article-title'><strong>{compatibility_emoji} {article['title']}</strong></div>", unsafe_allow_html=True)
-                
-                # Excerpt
-                if 'excerpt' in article:
-                    st.markdown(f"<div class='article-excerpt'>{article['excerpt']}</div>", unsafe_allow_html=True)
-                
-                # Metadata in specified order: compatibility, date, company, location
-                metadata_parts = []
-                
-                # compatibility (bold)
-                if 'compatibility' in article:
-                    metadata_parts.append(f"<strong>Compatibility: {article['compatibility']}%</strong>")
-                
-                # Date
-                if 'date' in article:
-                    formatted_date = article['date'].split('T')[0] if 'T' in article['date'] else article['date']
-                    metadata_parts.append(f"Date: {formatted_date}")
-                
-                # Company
-                if 'company' in article and article['company']:
-                    metadata_parts.append(f"Company: {article['company']}")
-                
-                # Location
-                if 'location' in article and article['location']:
-                    metadata_parts.append(f"Location: {article['location']}")
-                
-                # Join metadata with pipe separators
-                if metadata_parts:
-                    metadata_html = "<div class='article-metadata'>" + " | ".join(metadata_parts) + "</div>"
-                    st.markdown(metadata_html, unsafe_allow_html=True)
-
-                # Show analyze_date if available
-                if 'analyze_date' in article:
-                    st.markdown(f"<div class='article-metadata'>Analyzed: {article['analyze_date']}</div>", unsafe_allow_html=True)
-
-                # URL as a link that opens in a new tab
-                if 'url' in article and article['url']:
-                    url_html = f"<div class='article-url'><a href='{article['url']}' target='_blank'>{article['url']}</a></div>"
-                    st.markdown(url_html, unsafe_allow_html=True)
+        filtered_df = df[mask]
+    
+        # Apply sorting
+        if 'date' in filtered_df.columns and 'compatibility' in filtered_df.columns:
+            if sort_selection == 'Date (newest first)':
+                filtered_df = filtered_df.sort_values('date', ascending=False)
+            elif sort_selection == 'Date (oldest first)':
+                filtered_df = filtered_df.sort_values('date', ascending=True)
+            elif sort_selection == 'compatibility (highest first)':
+                filtered_df = filtered_df.sort_values('compatibility', ascending=False)
+            elif sort_selection == 'compatibility (lowest first)':
+                filtered_df = filtered_df.sort_values('compatibility', ascending=True)
+    else:
+        filtered_df = pd.DataFrame()
+
+    # Display data
+    if not filtered_df.empty:
+        st.markdown(f"<div class='article-header'><strong>Prospect List</strong> ({len(filtered_df)} matching)</div>", unsafe_allow_html=True)
+
+        # Only one page of the list is rendered, so each rerun sends the same amount of HTML
+        # however many prospects match
+        page_count = (len(filtered_df) + PAGE_SIZE - 1) // PAGE_SIZE
+        if page_count > 1:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+            filtered_df = filtered_df.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
+        # Compatibility emoji and metadata line for every row in one vectorized pass
+        filtered_df = filtered_df.assign(
+            emoji=get_compatibility_emoji(filtered_df['compatibility'].to_numpy()),
+            metadata_html=get_metadata_html(filtered_df)
+        )
+
+        # Build the whole list as one HTML block, so it is sent to the browser as a single element
+        parts = []
+        # Read the full articles for just the rows on this page
+        page_articles = read_articles(PROSPECTS_FILE, offsets, filtered_df['articleID'].to_numpy())
+        for article_id, emoji, metadata_html in zip(filtered_df['articleID'].to_numpy(), filtered_df['emoji'].to_numpy(), filtered_df['metadata_html'].to_numpy()):
+            article = page_articles.get(article_id)
+            if not article:
+                continue
+
+            # Title
+            parts.append("<div class='article-row'>")
+            parts.append(f"<div class='article-title'><strong>{emoji} {article['title']}</strong></div>")
+
+            # Excerpt
+            if 'excerpt' in article:
+                parts.append(f"<div class='article-excerpt'>{article['excerpt']}</div>")
+
+            # Metadata in specified order: compatibility, date, company, location
+            parts.append(metadata_html)
+
+            # Show analyze_date if available
+            if 'analyze_date' in article:
+                parts.append(f"<div class='article-metadata'>Analyzed: {article['analyze_date']}</div>")
+
+            # URL as a link that opens in a new tab
+            if 'url' in article and article['url']:
+                parts.append(f"<div class='article-url'><a href='{article['url']}' target='_blank'>{article['url']}</a></div>")
 
             # Much thinner separator line using the CSS class
-            st.markdown("<hr class='article-separator'>", unsafe_allow_html=True)
+            parts.append("</div><hr class='article-separator'>")
+
+        if parts:
+            st.markdown("".join(parts), unsafe_allow_html=True)
         else:
             st.info("No articles found matching your filters.")
 
+render_prospects(df, offsets)
+
 # Footer
 st.markdown("**Next Step:** After loading prospects, proceed to the Prospecting step to analyze them.")
\ No newline at end of file
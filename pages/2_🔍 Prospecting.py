@@ -1,13 +1,18 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 import sys
 
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils import (load_json_file, save_json_file, analyze_article, 
-                  analyze_all, keep_article, keep_all_articles, 
-                  get_articles_df, generate_criteria_from_feedback)
+# Add parent directory to path to import utils (only once, not on every rerun)
+_parent = os.path.dirname(os.path.dirname(__file__))
+if _parent not in sys.path:
+    sys.path.insert(0, _parent)
+from utils import (load_json_file, save_jsonl_append, import_json_articles, analyze_article, 
+                  analyze_all, keep_all_articles, 
+                  get_articles_df_cached, get_company_options_cached, file_signature,
+                  generate_criteria_from_feedback, render_header, get_compatibility_emoji,
+                  get_article_html, get_analysis_html)
 
 # Initialize session state variables
 if 'analyze_process_started' not in st.session_state:
@@ -22,6 +27,9 @@ if 'analyzed_articles_count' not in st.session_state:
     st.session_state.analyzed_articles_count = 0
 if 'kept_articles_count' not in st.session_state:
     st.session_state.kept_articles_count = 0
+# Articles kept with their Keep button in this session (by articleID), shown as Kept
+if 'kept_ids' not in st.session_state:
+    st.session_state.kept_ids = set()
 
 # Define callback functions
 def start_analyze_processing():
@@ -37,63 +45,48 @@ def reset_processing():
     st.session_state.keep_process_complete = False
     st.rerun()
 
-# Page configuration
-st.set_page_config(
-    page_title="prospectorAIDE - Prospecting",
-    page_icon="🔍",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
-st.logo("assets/prospectorAIDE-logo.png", size='large')
-
-# Load external CSS file
-def load_css(css_file):
-    if os.path.exists(css_file):
-        with open(css_file, "r") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    else:
-        st.warning(f"CSS file not found: {css_file}")
-
-# Load the CSS
-load_css("styles.css")
-
-# Create a container for logos in the header
-header = st.container()
-with header:
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        # App title
-        st.title("🔍 Prospecting")
-    
-    with col2:
-        # Company logo
-        if os.path.exists("assets/CtiPath-logo.png"):
-            st.image("assets/CtiPath-logo.png", width=150)
+# Page configuration and header
+render_header("Prospecting", "🔍")
 
 st.markdown("Review and analyze potential articles for your sales pipeline.")
 
 # File paths
-PROSPECTS_FILE = "data/prospects-new.json"
+PROSPECTS_FILE = "data/prospects-new.jsonl"
+LEGACY_PROSPECTS_FILE = "data/prospects-new.json"  # Saved by earlier versions, before JSONL
 KEPT_PROSPECTS_FILE = "data/prospects-kept.json"
-
-# Load data
-@st.cache_data(ttl=10)  # Cache with a short time-to-live to allow refreshing
-def load_data():
+PAGE_SIZE = 20  # Prospects rendered per page of the list
+# Thin line drawn above each card (part of the card's HTML, not an element of its own)
+CARD_SEPARATOR = "<p class='article-separator'>"
+# Filter and sort choices (fixed, so built once rather than on every rerun)
+DATE_OPTIONS = ('All', 'Today', 'Yesterday', 'Last 7 days')
+ANALYZED_OPTIONS = ('All', 'Analyzed', 'Not Analyzed')
+SORT_OPTIONS = ('Date (newest first)', 'Date (oldest first)',
+                'Compatibility (highest first)', 'Compatibility (lowest first)')
+
+# Bring in the prospects saved by earlier versions (only while there is no JSONL file yet)
+import_json_articles(LEGACY_PROSPECTS_FILE, PROSPECTS_FILE)
+
+# Load data. The file version (modification time and size) only keys the cache, so the
+# list is parsed once per change to the file rather than again after a time-to-live.
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_data(file_version):
     try:
         articles = load_json_file(PROSPECTS_FILE)
         # If articles is a list of dictionaries, convert to list and extract 'articleID'
         if articles and isinstance(articles, list) and 'articleID' in articles[0]:
-            # Make sure each article has an index based on its position
-            for i, article in enumerate(articles):
-                article['index'] = i
             return articles
         return []
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return []
 
-articles = load_data()
+articles = load_data(file_signature(PROSPECTS_FILE))
+# Look up articles (and their position in the list) by ID
+articles_by_id = {a.get('articleID'): a for a in articles if a.get('articleID') is not None}
+id_to_index = {a.get('articleID'): i for i, a in enumerate(articles) if a.get('articleID') is not None}
+
+# Convert to DataFrame
+df = get_articles_df_cached(PROSPECTS_FILE)
 
 # Display message if no articles loaded
 if not articles:
@@ -101,6 +94,10 @@ if not articles:
 else:
     # Display statistics
     st.subheader("📊 Statistics", anchor=False)
+    # Count the 40-59, 60-79 and 80-100 compatibility buckets in one vectorized pass
+    # (unscored articles aren't in any bucket)
+    compatibility = df['compatibility'].dropna().to_numpy(dtype=np.int16) if 'compatibility' in df.columns else np.zeros(0)
+    compatibility_counts, _ = np.histogram(np.clip(compatibility, 0, 100), bins=[0, 40, 60, 80, 101])
     col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
@@ -108,27 +105,24 @@ else:
 
     with col2:
         # Count articles with compatibility > 80
-        compatibility_80_count = sum(1 for a in articles if a.get('compatibility', 0) >= 80)
+        compatibility_80_count = compatibility_counts[3]
         st.metric("🟢 Compatibility (80-100%)", f"{compatibility_80_count}/{len(articles)}")
 
     with col3:
         # Count articles with compatibility > 60
-        compatibility_60_count = sum(1 for a in articles if a.get('compatibility', 0) >= 60 and a.get('compatibility', 0) < 80)
+        compatibility_60_count = compatibility_counts[2]
         st.metric("🔵 Compatibility (60-79%)", f"{compatibility_60_count}/{len(articles)}")
 
     with col4:
         # Count articles with compatibility > 40
-        compatibility_40_count = sum(1 for a in articles if a.get('compatibility', 0) >= 40 and a.get('compatibility', 0) < 60)
+        compatibility_40_count = compatibility_counts[1]
         st.metric("🟡 Compatibility (40-59%)", f"{compatibility_40_count}/{len(articles)}")
 
     with col5:
-        # Count analyzed articles based on presence of 'analysis' key
-        analyzed_count = sum(1 for a in articles if 'analysis' in a)
+        # Count analyzed articles based on presence of 'analysis' key (precomputed in the frame)
+        analyzed_count = int(df['is_analyzed'].sum()) if 'is_analyzed' in df.columns else 0
         st.metric("Analyzed Prospects", f"{analyzed_count}/{len(articles)}")
     
-# Convert to DataFrame
-df = get_articles_df(articles)
-
 # Filtering and sorting options
 st.subheader("Filter and Sort Prospects", anchor=False)
 col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 1])
@@ -140,65 +134,65 @@ with col1:
 with col2:
     # Filter by date (moved to second position)
     if 'date' in df.columns and not df.empty:
-        date_options = ['All', 'Today', 'Yesterday', 'Last 7 days']
-        date_filter = st.selectbox("Date", date_options)
+        date_filter = st.selectbox("Date", DATE_OPTIONS)
     else:
         date_filter = "All"
 
 with col3:
     # Filter by company (moved to third position)
     if 'company' in df.columns and not df.empty:
-        companies = ['All'] + sorted(df['company'].unique().tolist())
+        companies = ['All'] + get_company_options_cached(PROSPECTS_FILE)
         selected_company = st.selectbox("Company", companies)
     else:
         selected_company = "All"
 
 with col4:
     # New filter for analyzed status
-    analyzed_options = ['All', 'Analyzed', 'Not Analyzed']
-    analyzed_filter = st.selectbox("Analyzed", analyzed_options)
+    analyzed_filter = st.selectbox("Analyzed", ANALYZED_OPTIONS)
 
 with col5:
     # Sorting options (now in the fifth column)
-    sort_options = ['Date (newest first)', 'Date (oldest first)', 
-                   'Compatibility (highest first)', 'Compatibility (lowest first)']
-    sort_selection = st.selectbox("Sort By", sort_options)
+    sort_selection = st.selectbox("Sort By", SORT_OPTIONS)
 
-# Apply filters
+# Apply filters (combined into one mask, so only one filtered frame is built)
 filtered_df = pd.DataFrame()  # Initialize with an empty DataFrame
 if not df.empty:
-    filtered_df = df.copy()
+    mask = np.ones(len(df), dtype=bool)
     
-    # compatibility filter
-    if 'compatibility' in df.columns:
-        filtered_df = filtered_df[filtered_df['compatibility'] >= min_compatibility]
+    # compatibility filter (only set above 0, so unscored articles are listed until a minimum is chosen)
+    if 'compatibility' in df.columns and min_compatibility > 0:
+        mask &= (df['compatibility'] >= min_compatibility).to_numpy(dtype=bool, na_value=False)
     
-    # Date filter
+    # Date filter (each day is a range of datetime64 values, so the dates are compared as they
+    # are rather than normalized or boxed per row)
     if date_filter != "All" and 'date' in df.columns:
-        today = pd.Timestamp.now().floor('D')
+        today = pd.Timestamp.now().normalize()
+        date_values = df['date'].to_numpy()
         if date_filter == "Today":
-            filtered_df = filtered_df[filtered_df['date'].dt.date == today.date()]
+            tomorrow = today + pd.Timedelta(days=1)
+            mask &= (date_values >= today.to_datetime64()) & (date_values < tomorrow.to_datetime64())
         elif date_filter == "Yesterday":
             yesterday = today - pd.Timedelta(days=1)
-            filtered_df = filtered_df[filtered_df['date'].dt.date == yesterday.date()]
+            mask &= (date_values >= yesterday.to_datetime64()) & (date_values < today.to_datetime64())
         elif date_filter == "Last 7 days":
             last_week = today - pd.Timedelta(days=7)
-            filtered_df = filtered_df[filtered_df['date'] >= last_week]
+            mask &= (df['date'] >= last_week).to_numpy()
     
     # Company filter
     if selected_company != "All" and 'company' in df.columns:
-        filtered_df = filtered_df[filtered_df['company'] == selected_company]
+        mask &= (df['company'] == selected_company).to_numpy()
     
-    # Analyzed filter
+    # Analyzed filter (a precomputed column of the cached frame)
     if analyzed_filter != "All":
+        analyzed_mask = df['is_analyzed'].to_numpy()
         if analyzed_filter == "Analyzed":
             # Keep only articles that have 'analysis' key
-            filtered_df = filtered_df[filtered_df.apply(lambda row: 
-                'analysis' in next((a for a in articles if a.get('articleID') == row.get('articleID')), {}), axis=1)]
+            mask &= analyzed_mask
         elif analyzed_filter == "Not Analyzed":
             # Keep only articles that don't have 'analysis' key
-            filtered_df = filtered_df[filtered_df.apply(lambda row: 
-                'analysis' not in next((a for a in articles if a.get('articleID') == row.get('articleID')), {}), axis=1)]
+            mask &= ~analyzed_mask
+    
+    filtered_df = df[mask]
     
     # Apply sorting
     if 'date' in filtered_df.columns and 'compatibility' in filtered_df.columns:
@@ -237,29 +231,30 @@ if st.session_state.analyze_process_started and not st.session_state.analyze_pro
             filtered_article_ids = filtered_df['articleID'].tolist() if not filtered_df.empty else []
             
             if filtered_article_ids:
-                # Only analyze articles that match the filter
-                filtered_articles = [a for a in articles if a.get('articleID') in filtered_article_ids]
-                # Run analysis on filtered articles
-                analyzed_articles = analyze_all(filtered_articles)
+                # Only analyze articles that match the filter (looked up by position, in file order)
+                filtered_articles = [articles[i] for i in sorted(id_to_index[article_id] for article_id in filtered_article_ids if article_id in id_to_index)]
+                # Run analysis on filtered articles (several at once, so advance the bar as each one finishes)
+                analyze_progress = st.progress(0.0)
+                analyzed_articles = analyze_all(
+                    filtered_articles,
+                    on_progress=lambda done, total: analyze_progress.progress(done / total))
+                analyze_progress.empty()
                 
                 # Update the main articles list with the analyzed articles
                 for analyzed_article in analyzed_articles:
-                    for i, article in enumerate(articles):
-                        if article.get('articleID') == analyzed_article.get('articleID'):
-                            articles[i] = analyzed_article
-                            break
+                    i = id_to_index.get(analyzed_article.get('articleID'))
+                    if i is not None:
+                        articles[i] = analyzed_article
                 
-                # Save back to file
-                save_json_file(articles, PROSPECTS_FILE)
+                # Append the analyzed articles to the file
+                save_jsonl_append(analyzed_articles, PROSPECTS_FILE)
                 # Store count for success message
                 st.session_state.analyzed_articles_count = len(analyzed_articles)
             else:
                 st.session_state.analyzed_articles_count = 0
             
-            # Mark as complete
+            # Mark as complete (the appended file is picked up by its new version on the rerun)
             st.session_state.analyze_process_complete = True
-            # Clear cache to reload data
-            st.cache_data.clear()
     
     # Force a rerun to refresh the page and show the success message
     st.rerun()
@@ -275,16 +270,18 @@ if st.session_state.keep_process_started and not st.session_state.keep_process_c
             filtered_article_ids = filtered_df['articleID'].tolist() if not filtered_df.empty else []
             
             if filtered_article_ids:
-                # Only keep articles that match the filter
-                filtered_articles = [a for a in articles if a.get('articleID') in filtered_article_ids]
+                # Only keep articles that match the filter (looked up by position, in file order)
+                filtered_articles = [articles[i] for i in sorted(id_to_index[article_id] for article_id in filtered_article_ids if article_id in id_to_index)]
                 
                 st.write(f"Debug: Found {len(filtered_articles)} articles to keep")
                 
                 # Run keep_all_articles on filtered articles
                 kept_count = keep_all_articles(filtered_articles, KEPT_PROSPECTS_FILE)
+                if kept_count is not None:
+                    st.session_state.kept_ids.update(filtered_article_ids)
                 
-                # Store count for success message
-                st.session_state.kept_articles_count = kept_count
+                # Store count for success message (the articles that weren't kept already)
+                st.session_state.kept_articles_count = kept_count or 0
             else:
                 st.session_state.kept_articles_count = 0
                 
@@ -312,195 +309,152 @@ if st.session_state.keep_process_complete:
     # Add a button to reset the process state
     reset_processing()
 
-# Display data
-if not filtered_df.empty:
-    st.markdown(f"<div class='article-header'><strong>Prospect List</strong> ({len(filtered_df)} matching)</div>", unsafe_allow_html=True)
-
-    # Create a compact list of articles with minimal spacing
-    for idx, row in filtered_df.iterrows():
-        article_id = row.get('articleID')
-        article = next((a for a in articles if a.get('articleID') == article_id), None)
-        
-        if article:
-            # Use a 2-column layout: Article Content | Action Buttons
-            cols = st.columns([6, 1])
+# Function to render one article card with its buttons. Clicking the card's buttons,
+# toggles or feedback form only reruns this card, not the whole page.
+@st.fragment
+def render_article_card(article, compatibility_emoji, formatted_date):
+    article_id = article['articleID']
+    # An article analyzed in an earlier run of this card replaces the one it was drawn with
+    current_article = articles_by_id.get(article_id, article)
+    if current_article is not article:
+        article = current_article
+        compatibility_emoji = get_compatibility_emoji([article.get('compatibility', 0)])[0]
+
+    # Use a 2-column layout: Article Content | Action Buttons
+    cols = st.columns([6, 1])
+    
+    with cols[0]:
+        # Separator, title, excerpt, metadata and URL as one HTML block (in a placeholder,
+        # so an analyzed article can be redrawn in place)
+        article_placeholder = st.empty()
+        article_placeholder.markdown(CARD_SEPARATOR + get_article_html(article, compatibility_emoji, formatted_date), unsafe_allow_html=True)
+
+        # Display analysis information if available
+        if 'analysis' in article:
+            analysis = article['analysis']
+            expander_title = f"Show Analysis from {analysis['analysis_date']}" if 'analysis_date' in analysis else "Show Analysis"
             
-            with cols[0]:
-                # Title
-                if article['compatibility'] >= 80:
-                    compatibility_emoji = "🟢"
-                elif article['compatibility'] >= 60:
-                    compatibility_emoji = "🔵"
-                elif article['compatibility'] >= 40:
-                    compatibility_emoji = "🟡"
-                elif article['compatibility'] >= 20:
-                    compatibility_emoji = "🔴"
-                else:
-                    compatibility_emoji = "⚫"
-
-                st.markdown(f"<div class='article-title'><strong>{compatibility_emoji} {article['title']}</strong></div>", unsafe_allow_html=True)
-                
-                # Excerpt
-                if 'excerpt' in article:
-                    st.markdown(f"<div class='article-excerpt'>{article['excerpt']}</div>", unsafe_allow_html=True)
-                
-                # Metadata in specified order: compatibility, date, company, location
-                metadata_parts = []
-                
-                # compatibility (bold)
-                if 'compatibility' in article:
-                    metadata_parts.append(f"<strong>Compatibility: {article['compatibility']}%</strong>")
-                
-                # Date
-                if 'date' in article:
-                    formatted_date = article['date'].split('T')[0] if 'T' in article['date'] else article['date']
-                    metadata_parts.append(f"<strong>Date:</strong> {formatted_date}")
+            # The analysis HTML is only built and sent once the toggle is switched on
+            if st.toggle(expander_title, key=f"show_analysis_{article_id}"):
+                st.markdown(get_analysis_html(analysis), unsafe_allow_html=True)
+
+        # The feedback form is only built and sent once the toggle is switched on
+        # (an expander sends its form, text area and button on every rerun)
+        if st.toggle("Provide feedback", key=f"show_feedback_{article_id}"):
+            # Check if feedback has been submitted recently
+            feedback_submitted_key = f"feedback_{article_id}_submitted"
+            feedback_key = f"feedback_{article_id}"
+            
+            # Initialize feedback in session state if not present
+            if feedback_key not in st.session_state:
+                st.session_state[feedback_key] = ""
+            
+            # Create a form to collect feedback
+            with st.form(key=f"feedback_form_{article_id}"):
+                # Use session state to maintain the feedback text
+                feedback = st.text_area("Feedback", value=st.session_state[feedback_key], 
+                                    height=100, key=f"textarea_{article_id}",
+                                    placeholder="Provide feedback to improve analysis.")
                 
-                # Company
-                if 'company' in article and article['company']:
-                    metadata_parts.append(f"<strong>Company:</strong> {article['company']}")
+                # Submit button for the form
+                submit_feedback = st.form_submit_button("Submit Feedback")
                 
-                # Location
-                if 'location' in article and article['location']:
-                    metadata_parts.append(f"<strong>Location:</strong> {article['location']}")
+            # Process feedback when submitted
+            if submit_feedback and feedback.strip():
+                # Save the feedback text
+                st.session_state[feedback_key] = feedback
                 
-                # Join metadata with pipe separators
-                if metadata_parts:
-                    metadata_html = "<div class='article-metadata'>" + " | ".join(metadata_parts) + "</div>"
-                    st.markdown(metadata_html, unsafe_allow_html=True)
-
-                # Show analyze_date if available
-                if 'analyze_date' in article:
-                    st.markdown(f"<div class='article-metadata'>Analyzed: {article['analyze_date']}</div>", unsafe_allow_html=True)
-
-                # URL as a link that opens in a new tab
-                if 'url' in article and article['url']:
-                    url_html = f"<div class='article-url'><a href='{article['url']}' target='_blank'>{article['url']}</a></div>"
-                    st.markdown(url_html, unsafe_allow_html=True)
-
-                # Display analysis information if available
-                if 'analysis' in article:
-                    analysis = article['analysis']
-                    expander_title = f"Show Analysis from {analysis['analysis_date']}" if 'analysis_date' in analysis else "Show Analysis"
-                    
-                    with st.expander(expander_title):
-                        # Display analysis information in a clean format
-                        if 'analysis_compatibility' in analysis:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Compatibility:</strong> {analysis['analysis_compatibility']}%</div>", unsafe_allow_html=True)
-
-                        if 'original_compatibility' in analysis:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Original Compatibility:</strong> {analysis['original_compatibility']}%</div>", unsafe_allow_html=True)                        
-
-                        if 'analysis_explanation' in analysis:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Explanation:</strong> {analysis['analysis_explanation']}</div>", unsafe_allow_html=True)
+                with st.spinner("Processing feedback..."):
+                    try:
+                        # Call the generate_criteria_from_feedback function from utils
+                        new_criteria = generate_criteria_from_feedback(article, feedback)
                         
-                        if 'analysis_company' in analysis and analysis['analysis_company']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Company:</strong> {analysis['analysis_company']}</div>", unsafe_allow_html=True)
+                        if new_criteria and isinstance(new_criteria, list) and len(new_criteria) > 0:
+                            # Show success message
+                            st.success(f"Feedback applied to criteria! Added {len(new_criteria)} new criteria.")
+                            # Clear the feedback text after successful submission
+                            st.session_state[feedback_key] = ""
+                        else:
+                            st.warning("Feedback processed, but no new criteria were generated.")
                         
-                        if 'analysis_location' in analysis and analysis['analysis_location']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Location:</strong> {analysis['analysis_location']}</div>", unsafe_allow_html=True)
+                        # Mark as submitted
+                        st.session_state[feedback_submitted_key] = True
                         
-                        if 'analysis_contact' in analysis and analysis['analysis_contact']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Contact:</strong> {analysis['analysis_contact']}</div>", unsafe_allow_html=True)
+                        # Force a rerun to refresh the UI with cleared form
+                        st.rerun()
                         
-                        if 'analysis_summary' in analysis and analysis['analysis_summary']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Project Summary:</strong> {analysis['analysis_summary']}</div>", unsafe_allow_html=True)
-
-                feedback_expander_title = "Provide feedback"
-                                
-                with st.expander(feedback_expander_title):
-                    # Check if feedback has been submitted recently
-                    feedback_submitted_key = f"feedback_{article_id}_submitted"
-                    feedback_key = f"feedback_{article_id}"
+                    except Exception as e:
+                        st.error(f"Error processing feedback: {str(e)}")
+                
+            # Provide a note about feedback usage
+            st.caption("Your feedback helps refine our criteria for analyzing prospects.")
+
+    with cols[1]:
+        # Stack buttons vertically to make them wider
+        # Only show buttons if not in the middle of a process
+        if not st.session_state.analyze_process_started and not st.session_state.keep_process_started:
+            if 'analysis' in article:
+                analyze_button_text = "Re-Analyze"
+            else:
+                analyze_button_text = "Analyze"
+            analyze_button = st.button(analyze_button_text, key=f"analyze_{article_id}", type="primary", use_container_width=True)
+            kept = article_id in st.session_state.kept_ids
+            keep_placeholder = st.empty()
+            keep_button = keep_placeholder.button("Kept" if kept else "Keep", key=f"keep_{article_id}", type="secondary", use_container_width=True, disabled=kept)
+            
+            # Handle button clicks
+            if analyze_button:
+                with st.spinner("Analyzing..."):
+                    # Analyze the article
+                    analyzed_article = analyze_article(article)
                     
-                    # Initialize feedback in session state if not present
-                    if feedback_key not in st.session_state:
-                        st.session_state[feedback_key] = ""
+                    # Update the article in the list
+                    i = id_to_index.get(analyzed_article.get('articleID'))
+                    if i is not None:
+                        articles[i] = analyzed_article
+                    articles_by_id[article_id] = analyzed_article
                     
-                    # Create a form to collect feedback
-                    with st.form(key=f"feedback_form_{article_id}"):
-                        # Use session state to maintain the feedback text
-                        feedback = st.text_area("Feedback", value=st.session_state[feedback_key], 
-                                            height=100, key=f"textarea_{article_id}",
-                                            placeholder="Provide feedback to improve analysis.")
-                        
-                        # Submit button for the form
-                        submit_feedback = st.form_submit_button("Submit Feedback")
-                        
-                    # Process feedback when submitted
-                    if submit_feedback and feedback.strip():
-                        # Save the feedback text
-                        st.session_state[feedback_key] = feedback
-                        
-                        with st.spinner("Processing feedback..."):
-                            try:
-                                # Call the generate_criteria_from_feedback function from utils
-                                new_criteria = generate_criteria_from_feedback(article, feedback)
-                                
-                                if new_criteria and isinstance(new_criteria, list) and len(new_criteria) > 0:
-                                    # Show success message
-                                    st.success(f"Feedback applied to criteria! Added {len(new_criteria)} new criteria.")
-                                    # Clear the feedback text after successful submission
-                                    st.session_state[feedback_key] = ""
-                                else:
-                                    st.warning("Feedback processed, but no new criteria were generated.")
-                                
-                                # Mark as submitted
-                                st.session_state[feedback_submitted_key] = True
-                                
-                                # Force a rerun to refresh the UI with cleared form
-                                st.rerun()
-                                
-                            except Exception as e:
-                                st.error(f"Error processing feedback: {str(e)}")
-                        
-                    # Provide a note about feedback usage
-                    st.caption("Your feedback helps refine our criteria for analyzing prospects.")
-
-            with cols[1]:
-                # Stack buttons vertically to make them wider
-                # Only show buttons if not in the middle of a process
-                if not st.session_state.analyze_process_started and not st.session_state.keep_process_started:
-                    if 'analysis' in article:
-                        analyze_button_text = "Re-Analyze"
-                    else:
-                        analyze_button_text = "Analyze"
-                    analyze_button = st.button(analyze_button_text, key=f"analyze_{article_id}", type="primary", use_container_width=True)
-                    keep_button = st.button("Keep", key=f"keep_{article_id}", type="secondary", use_container_width=True)
+                    # Append the analyzed article to the file
+                    save_jsonl_append([analyzed_article], PROSPECTS_FILE)
                     
-                    # Handle button clicks
-                    if analyze_button:
-                        with st.spinner("Analyzing..."):
-                            # Analyze the article
-                            analyzed_article = analyze_article(article)
-                            
-                            # Update the article in the list
-                            for i, a in enumerate(articles):
-                                if a.get('articleID') == analyzed_article.get('articleID'):
-                                    articles[i] = analyzed_article
-                                    break
-                            
-                            # Save back to file
-                            save_json_file(articles, PROSPECTS_FILE)
-                            
-                            # Show success message
-                            st.success(f"Article analyzed!")
-                            
-                            # Clear cache to reload data
-                            st.cache_data.clear()
-                            
-                            # Rerun to update UI
-                            st.rerun()
+                    # Redraw just this article instead of rerunning the whole page
+                    # (the appended file is picked up by its new modification time on the next rerun)
+                    analyzed_emoji = get_compatibility_emoji([analyzed_article.get('compatibility', 0)])[0]
+                    article_placeholder.markdown(CARD_SEPARATOR + get_article_html(analyzed_article, analyzed_emoji, formatted_date), unsafe_allow_html=True)
                     
-                    if keep_button:
-                        with st.spinner("Keeping..."):
-                            if keep_article(article, KEPT_PROSPECTS_FILE):
-                                st.success(f"Article kept!")
-                            else:
-                                st.error(f"Failed to keep article.")
-
-            # Much thinner separator line using the CSS class
-            st.markdown("<p class='article-separator'>", unsafe_allow_html=True)
+                    # Show success message
+                    st.success(f"Article analyzed!")
+            
+            if keep_button:
+                # Write the article to the kept file straight away, so it isn't lost if the session ends
+                if keep_all_articles([article], KEPT_PROSPECTS_FILE) is not None:
+                    st.session_state.kept_ids.add(article_id)
+                    # Just show this card's button as kept
+                    keep_placeholder.button("Kept", key=f"kept_{article_id}", type="secondary", use_container_width=True, disabled=True)
+                else:
+                    st.error("Failed to keep article.")
+
+# Display data
+if not filtered_df.empty:
+    st.markdown(f"<div class='article-header'><strong>Prospect List</strong> ({len(filtered_df)} matching)</div>", unsafe_allow_html=True)
+
+    # Only one page of the list is rendered (Analyze All and Keep All still use every
+    # matching prospect), so the widget count per rerun doesn't grow with the list
+    page_df = filtered_df
+    page_count = (len(filtered_df) + PAGE_SIZE - 1) // PAGE_SIZE
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+        page_df = filtered_df.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    # Emoji for the page's rows, computed per column rather than per article
+    page_df = page_df.assign(compatibility_emoji=get_compatibility_emoji(page_df['compatibility'].to_numpy(dtype=float, na_value=np.nan)))
+
+    # Create a compact list of articles with minimal spacing
+    # (the page's columns are zipped rather than building a Series per row with iterrows)
+    for article_id, compatibility_emoji, formatted_date in zip(page_df['articleID'].to_numpy(), page_df['compatibility_emoji'].to_numpy(), page_df['date_str'].to_numpy()):
+        article = articles_by_id.get(article_id)
+        
+        if article:
+            render_article_card(article, compatibility_emoji, formatted_date)
         else:
             st.info("No articles found matching your filters.")
 
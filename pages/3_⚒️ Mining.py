@@ -1,75 +1,43 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 import sys
-import datetime
 
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils import load_json_file, save_json_file, get_articles_df, remove_article
+# Add parent directory to path to import utils (only once, not on every rerun)
+_parent = os.path.dirname(os.path.dirname(__file__))
+if _parent not in sys.path:
+    sys.path.insert(0, _parent)
+from utils import get_articles_index, get_articles_df_cached, get_company_options_cached, file_signature, remove_article, render_header, get_compatibility_emoji, get_article_html, get_analysis_html
 
 # Initialize session state variables
 if 'selected_mining_article_index' not in st.session_state:
     st.session_state.selected_mining_article_index = None
 
-# Page configuration
-st.set_page_config(
-    page_title="prospectorAIDE - Mining",
-    page_icon="⚒️",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
-st.logo("assets/prospectorAIDE-logo.png", size='large')
-
-# Load external CSS file
-def load_css(css_file):
-    if os.path.exists(css_file):
-        with open(css_file, "r") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    else:
-        st.warning(f"CSS file not found: {css_file}")
-
-# Load the CSS
-load_css("styles.css")
-
-# Create a container for logos in the header
-header = st.container()
-with header:
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        # App title
-        st.title("⚒️ Mining", anchor=False)
-    
-    with col2:
-        # Company logo
-        if os.path.exists("assets/CtiPath-logo.png"):
-            st.image("assets/CtiPath-logo.png", width=150)
+# Page configuration and header
+render_header("Mining", "⚒️")
 
 st.markdown("Extract valuable information for prospects that passed the prospecting stage.")
 
 # File paths
 KEPT_ARTICLES_FILE = "data/prospects-kept.json"
-
-# Load data
-@st.cache_data(ttl=10)  # Cache with a short time-to-live to allow refreshing
-def load_kept_data():
-    articles = load_json_file(KEPT_ARTICLES_FILE)
-    # If articles is a list of dictionaries, convert to list and extract 'articleID'
-    if articles and isinstance(articles, list) and 'articleID' in articles[0]:
-        # Make sure each article has an index based on its position
-        for i, article in enumerate(articles):
-            article['index'] = i
-    return articles
-
-kept_articles = load_kept_data()
+# Filter and sort choices (fixed, so built once rather than on every rerun)
+DATE_OPTIONS = ('All', 'Today', 'Yesterday', 'Last 7 days')
+ANALYZED_OPTIONS = ('All', 'Analyzed', 'Not Analyzed')
+SORT_OPTIONS = ('Date (newest first)', 'Date (oldest first)',
+                'Compatibility (highest first)', 'Compatibility (lowest first)')
+
+# Load data, and look up articles by ID when filtering and rendering the rows. Both are
+# shared by reference across sessions and reruns (not copied on every run like cache_data
+# results), and only reloaded when the file changes, so they must not be modified here.
+kept_articles, articles_by_id = get_articles_index(KEPT_ARTICLES_FILE, *file_signature(KEPT_ARTICLES_FILE))
 # Check if there are any kept articles
 if not kept_articles:
     st.warning("No prospects have been kept yet. Please go to the Prospecting page and keep some prospects first.")
     st.stop()
 
 # Convert to DataFrame
-df = get_articles_df(kept_articles)
+df = get_articles_df_cached(KEPT_ARTICLES_FILE)
 
 # Display statistics
 st.subheader("📊 Statistics", anchor=False)
@@ -79,20 +47,22 @@ with col1:
     st.metric("Total Prospects", len(kept_articles))
 
 with col2:
-    if 'compatibility' in df.columns:
-        avg_compatibility = df['compatibility'].mean()
+    # (the average of the scored articles; there is none if no article has a score yet)
+    avg_compatibility = df['compatibility'].mean() if 'compatibility' in df.columns else None
+    if pd.notna(avg_compatibility):
         st.metric("Average Compatibility", f"{avg_compatibility:.0f}%")
     else:
         st.metric("Average Compatibility", "N/A")
 
 with col3:
     # Count analyzed articles based on presence of 'analysis' key instead of analyze_date
-    analyzed_count = sum(1 for a in kept_articles if 'analysis' in a)
+    # (precomputed in the cached frame, so the kept list isn't walked again)
+    analyzed_count = int(df['is_analyzed'].sum()) if 'is_analyzed' in df.columns else 0
     st.metric("Analyzed Prospects", f"{analyzed_count}/{len(kept_articles)}")
 
 with col4:
-    # Count mined articles based on presence of 'mined' key
-    mined_count = sum(1 for a in kept_articles if 'mined' in a)
+    # Count mined articles based on presence of 'mined' key (also precomputed in the cached frame)
+    mined_count = int(df['is_mined'].sum()) if 'is_mined' in df.columns else 0
     st.metric("Mined Prospects", f"{mined_count}/{len(kept_articles)}")
 
 # Filtering and sorting options (matching Prospecting page)
@@ -106,65 +76,65 @@ with col1:
 with col2:
     # Filter by date
     if 'date' in df.columns and not df.empty:
-        date_options = ['All', 'Today', 'Yesterday', 'Last 7 days']
-        date_filter = st.selectbox("Date", date_options)
+        date_filter = st.selectbox("Date", DATE_OPTIONS)
     else:
         date_filter = "All"
 
 with col3:
     # Filter by company
     if 'company' in df.columns and not df.empty:
-        companies = ['All'] + sorted(df['company'].unique().tolist())
+        companies = ['All'] + get_company_options_cached(KEPT_ARTICLES_FILE)
         selected_company = st.selectbox("Company", companies)
     else:
         selected_company = "All"
 
 with col4:
     # New filter for analyzed status
-    analyzed_options = ['All', 'Analyzed', 'Not Analyzed']
-    analyzed_filter = st.selectbox("Analyzed", analyzed_options)
+    analyzed_filter = st.selectbox("Analyzed", ANALYZED_OPTIONS)
 
 with col5:
     # Sorting options
-    sort_options = ['Date (newest first)', 'Date (oldest first)', 
-                   'Compatibility (highest first)', 'Compatibility (lowest first)']
-    sort_selection = st.selectbox("Sort By", sort_options)
+    sort_selection = st.selectbox("Sort By", SORT_OPTIONS)
 
-# Apply filters
+# Apply filters (combined into one mask, so only one filtered frame is built)
 filtered_df = pd.DataFrame()  # Initialize with an empty DataFrame
 if not df.empty:
-    filtered_df = df.copy()
+    mask = np.ones(len(df), dtype=bool)
     
-    # compatibility filter
-    if 'compatibility' in df.columns:
-        filtered_df = filtered_df[filtered_df['compatibility'] >= min_compatibility]
+    # compatibility filter (only set above 0, so unscored articles are listed until a minimum is chosen)
+    if 'compatibility' in df.columns and min_compatibility > 0:
+        mask &= (df['compatibility'] >= min_compatibility).to_numpy(dtype=bool, na_value=False)
     
-    # Date filter
+    # Date filter (each day is a range of datetime64 values, so the dates are compared as they
+    # are rather than normalized or boxed per row)
     if date_filter != "All" and 'date' in df.columns:
-        today = pd.Timestamp.now().floor('D')
+        today = pd.Timestamp.now().normalize()
+        date_values = df['date'].to_numpy()
         if date_filter == "Today":
-            filtered_df = filtered_df[filtered_df['date'].dt.date == today.date()]
+            tomorrow = today + pd.Timedelta(days=1)
+            mask &= (date_values >= today.to_datetime64()) & (date_values < tomorrow.to_datetime64())
         elif date_filter == "Yesterday":
             yesterday = today - pd.Timedelta(days=1)
-            filtered_df = filtered_df[filtered_df['date'].dt.date == yesterday.date()]
+            mask &= (date_values >= yesterday.to_datetime64()) & (date_values < today.to_datetime64())
         elif date_filter == "Last 7 days":
             last_week = today - pd.Timedelta(days=7)
-            filtered_df = filtered_df[filtered_df['date'] >= last_week]
+            mask &= (df['date'] >= last_week).to_numpy()
     
     # Company filter
     if selected_company != "All" and 'company' in df.columns:
-        filtered_df = filtered_df[filtered_df['company'] == selected_company]
+        mask &= (df['company'] == selected_company).to_numpy()
     
-    # Analyzed filter
-    if analyzed_filter != "All":
+    # Analyzed filter (a precomputed column of the cached frame)
+    if analyzed_filter != "All" and 'is_analyzed' in df.columns:
+        analyzed_mask = df['is_analyzed'].to_numpy()
         if analyzed_filter == "Analyzed":
             # Keep only articles that have 'analysis' key
-            filtered_df = filtered_df[filtered_df.apply(lambda row: 
-                'analysis' in next((a for a in kept_articles if a.get('articleID') == row.get('articleID')), {}), axis=1)]
+            mask &= analyzed_mask
         elif analyzed_filter == "Not Analyzed":
             # Keep only articles that don't have 'analysis' key
-            filtered_df = filtered_df[filtered_df.apply(lambda row: 
-                'analysis' not in next((a for a in kept_articles if a.get('articleID') == row.get('articleID')), {}), axis=1)]
+            mask &= ~analyzed_mask
+    
+    filtered_df = df[mask]
     
     # Apply sorting
     if 'date' in filtered_df.columns and 'compatibility' in filtered_df.columns:
@@ -177,123 +147,79 @@ if not df.empty:
         elif sort_selection == 'Compatibility (lowest first)':
             filtered_df = filtered_df.sort_values('compatibility', ascending=True)
 
-# Display data in the same format as the Prospecting page
+# Show the analysis of the selected prospect in a dialog, so it is only built when asked for
+@st.dialog("Analysis", width="large")
+def show_analysis(article):
+    analysis = article['analysis']
+    if 'analysis_date' in analysis:
+        st.caption(f"Analysis from {analysis['analysis_date']}")
+    st.markdown(get_analysis_html(analysis), unsafe_allow_html=True)
+
+# Display the prospects as one table (a single element however long the list is), with the
+# actions below it applying to the selected row
 if not filtered_df.empty:
     st.markdown(f"<div class='article-header'><strong>Prospect List</strong> ({len(filtered_df)} matching)</div>", unsafe_allow_html=True)
 
-    # Create a compact list of articles with minimal spacing
-    for idx, row in filtered_df.iterrows():
-        article_id = row.get('articleID')
-        article = next((a for a in kept_articles if a.get('articleID') == article_id), None)
-        
-        if article:
-            # Use a 2-column layout: Article Content | Action Buttons
-            cols = st.columns([6, 1])
-            
-            with cols[0]:
-                # Title with compatibility emoji
-                if article['compatibility'] >= 80:
-                    compatibility_emoji = "🟢"
-                elif article['compatibility'] >= 60:
-                    compatibility_emoji = "🔵"
-                elif article['compatibility'] >= 40:
-                    compatibility_emoji = "🟡"
-                elif article['compatibility'] >= 20:
-                    compatibility_emoji = "🔴"
-                else:
-                    compatibility_emoji = "⚫"
-
-                st.markdown(f"<div class='article-title'><strong>{compatibility_emoji} {article['title']}</strong></div>", unsafe_allow_html=True)
-                
-                # Excerpt
-                if 'excerpt' in article:
-                    st.markdown(f"<div class='article-excerpt'>{article['excerpt']}</div>", unsafe_allow_html=True)
-                
-                # Metadata in specified order: compatibility, date, company, location
-                metadata_parts = []
-                
-                # compatibility (bold)
-                if 'compatibility' in article:
-                    metadata_parts.append(f"<strong>Compatibility: {article['compatibility']}%</strong>")
-                
-                # Date
-                if 'date' in article:
-                    formatted_date = article['date'].split('T')[0] if 'T' in article['date'] else article['date']
-                    metadata_parts.append(f"<strong>Date:</strong> {formatted_date}")
-                
-                # Company
-                if 'company' in article and article['company']:
-                    metadata_parts.append(f"<strong>Company:</strong> {article['company']}")
-                
-                # Location
-                if 'location' in article and article['location']:
-                    metadata_parts.append(f"<strong>Location:</strong> {article['location']}")
-                
-                # Join metadata with pipe separators
-                if metadata_parts:
-                    metadata_html = "<div class='article-metadata'>" + " | ".join(metadata_parts) + "</div>"
-                    st.markdown(metadata_html, unsafe_allow_html=True)
-
-                # Show analyze_date if available
-                if 'analyze_date' in article:
-                    st.markdown(f"<div class='article-metadata'>Analyzed: {article['analyze_date']}</div>", unsafe_allow_html=True)
-
-                # URL as a link that opens in a new tab
-                if 'url' in article and article['url']:
-                    url_html = f"<div class='article-url'><a href='{article['url']}' target='_blank'>{article['url']}</a></div>"
-                    st.markdown(url_html, unsafe_allow_html=True)
+    # Compatibility emoji for every row in one vectorized pass
+    filtered_df = filtered_df.assign(emoji=get_compatibility_emoji(filtered_df['compatibility'].to_numpy(dtype=float, na_value=np.nan)))
+    display_columns = [c for c in ('emoji', 'title', 'compatibility', 'date_str', 'company', 'location', 'is_analyzed') if c in filtered_df.columns]
+
+    # No key, so the selection is cleared whenever the filtered rows change
+    event = st.dataframe(
+        filtered_df[display_columns],
+        use_container_width=True,
+        column_config={
+            "emoji": st.column_config.TextColumn("", width="small"),
+            "title": st.column_config.TextColumn("Title", width="large"),
+            "compatibility": st.column_config.NumberColumn(
+                "Compatibility",
+                format="%d%%"
+            ),
+            "date_str": st.column_config.TextColumn("Date"),
+            "company": st.column_config.TextColumn("Company"),
+            "location": st.column_config.TextColumn("Location"),
+            "is_analyzed": st.column_config.CheckboxColumn("Analyzed"),
+        },
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row"
+    )
+
+    selected_rows = event.selection.rows
+    if selected_rows:
+        selected_row = filtered_df.iloc[selected_rows[0]]
+        article = articles_by_id.get(selected_row['articleID'])
 
-                # Display analysis information if available
-                if 'analysis' in article:
-                    analysis = article['analysis']
-                    expander_title = f"Show Analysis from {analysis['analysis_date']}" if 'analysis_date' in analysis else "Show Analysis"
-                    
-                    with st.expander(expander_title):
-                        # Display analysis information in a clean format
-                        if 'analysis_compatibility' in analysis:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Compatibility:</strong> {analysis['analysis_compatibility']}%</div>", unsafe_allow_html=True)
-
-                        if 'original_compatibility' in analysis:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Original Compatibility:</strong> {analysis['original_compatibility']}%</div>", unsafe_allow_html=True)                        
+        if article:
+            # Title, excerpt, metadata and URL of the selected prospect as one HTML block
+            st.markdown(get_article_html(article, selected_row['emoji'], selected_row['date_str']), unsafe_allow_html=True)
 
-                        if 'analysis_explanation' in analysis:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Explanation:</strong> {analysis['analysis_explanation']}</div>", unsafe_allow_html=True)
-                        
-                        if 'analysis_company' in analysis and analysis['analysis_company']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Company:</strong> {analysis['analysis_company']}</div>", unsafe_allow_html=True)
-                        
-                        if 'analysis_location' in analysis and analysis['analysis_location']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Location:</strong> {analysis['analysis_location']}</div>", unsafe_allow_html=True)
-                        
-                        if 'analysis_contact' in analysis and analysis['analysis_contact']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Contact:</strong> {analysis['analysis_contact']}</div>", unsafe_allow_html=True)
-                        
-                        if 'analysis_summary' in analysis and analysis['analysis_summary']:
-                            st.markdown(f"<div class='analysis-item'><strong class='analysis-label'>Project Summary:</strong> {analysis['analysis_summary']}</div>", unsafe_allow_html=True)
+            col1, col2, col3 = st.columns(3)
 
-            with cols[1]:
+            with col1:
                 # Mine button
-                if st.button("Mine", key=f"mine_{article_id}", type="primary", use_container_width=True):
-                    st.session_state.selected_mining_article_index = idx
+                if st.button("Mine selected", key="mine_selected", type="primary", use_container_width=True):
+                    st.session_state.selected_mining_article_index = selected_row.name
                     # Use rerun to update the UI with the selected article
                     st.rerun()
-                
+
+            with col2:
                 # Remove button
-                if st.button("Remove", key=f"remove_{article_id}", type="secondary", use_container_width=True):
+                if st.button("Remove selected", key="remove_selected", type="secondary", use_container_width=True):
                     # Call the remove_article function
-                    if remove_article(article_id, KEPT_ARTICLES_FILE):
+                    if remove_article(article['articleID'], KEPT_ARTICLES_FILE):
                         st.success(f"Article '{article['title']}' removed successfully.")
-                        # Clear the cache to force data reload
-                        st.cache_data.clear()
-                        # Reload the page to reflect the changes
+                        # Reload the page to reflect the changes (the rewritten file is picked up by its new version)
                         st.rerun()
                     else:
                         st.error("Failed to remove the article.")
 
-            # Much thinner separator line using the CSS class
-            st.markdown("<hr class='article-separator'>", unsafe_allow_html=True)
-        else:
-            st.info("No articles found matching your filters.")
+            with col3:
+                # Details button (only when there is an analysis to show)
+                if st.button("Details", key="details_selected", disabled='analysis' not in article, use_container_width=True):
+                    show_analysis(article)
+    else:
+        st.caption("Select a prospect in the table to mine it, remove it or see its analysis.")
 else:
     st.info("No articles found matching your filters.")
 
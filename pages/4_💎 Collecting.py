@@ -5,32 +5,14 @@ import sys
 import datetime
 import json
 
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils import load_json_file, save_json_file, get_articles_df
+# Add parent directory to path to import utils (only once, not on every rerun)
+_parent = os.path.dirname(os.path.dirname(__file__))
+if _parent not in sys.path:
+    sys.path.insert(0, _parent)
+from utils import load_json_file, save_json_file, get_articles_df_cached, get_company_options_cached, file_signature, get_articles_index, render_header
 
-# Page configuration
-st.set_page_config(
-    page_title="prospectorAIDE - Collecting",
-    page_icon="💎",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-st.logo("assets/prospectorAIDE-logo.png", size='large')
-
-# Create a container for logos in the header
-header = st.container()
-with header:
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        # App title
-        st.title("💎 Collecting", anchor=False)
-    
-    with col2:
-        # Company logo
-        if os.path.exists("assets/CtiPath-logo.png"):
-            st.image("assets/CtiPath-logo.png", width=150)
+# Page configuration and header
+render_header("Collecting", "💎", sidebar="expanded", css_file=None)
 
 st.markdown("Organize and finalize the collection of valuable articles for your sales process.")
 
@@ -38,19 +20,19 @@ st.markdown("Organize and finalize the collection of valuable articles for your
 KEPT_ARTICLES_FILE = "data/articles-kept.json"
 FINAL_COLLECTION_FILE = "data/final-collection.json"
 
-# Load data
-@st.cache_data(ttl=10)  # Cache with a short time-to-live to allow refreshing
-def load_kept_data():
-    articles = load_json_file(KEPT_ARTICLES_FILE)
-    return articles
-
-@st.cache_data(ttl=10)
-def load_final_collection():
+# Load data. The file version (modification time and size) only keys the cache, so each
+# list is reloaded as soon as its file changes rather than after a time-to-live.
+# The kept articles are only read here, so they are shared by reference (with an
+# articleID index) rather than copied on every run like cache_data results.
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_final_collection(file_version):
     articles = load_json_file(FINAL_COLLECTION_FILE)
     return articles
 
-kept_articles = load_kept_data()
-final_collection = load_final_collection()
+kept_articles, kept_by_id = get_articles_index(KEPT_ARTICLES_FILE, *file_signature(KEPT_ARTICLES_FILE))
+final_collection = load_final_collection(file_signature(FINAL_COLLECTION_FILE))
+# Check final collection membership without scanning the list
+final_ids = {a.get('articleID') for a in final_collection or [] if 'articleID' in a}
 
 # Check if there are any kept articles
 if not kept_articles:
@@ -58,8 +40,8 @@ if not kept_articles:
     st.stop()
 
 # Convert to DataFrame
-df = get_articles_df(kept_articles)
-final_df = get_articles_df(final_collection)
+df = get_articles_df_cached(KEPT_ARTICLES_FILE)
+final_df = get_articles_df_cached(FINAL_COLLECTION_FILE)
 
 # Tabs for different views
 tab1, tab2 = st.tabs(["Articles Overview", "Collection Management"])
@@ -101,21 +83,18 @@ with tab1:
         # Create bins for confidence scores
         bins = [0, 20, 40, 60, 80, 100]
         labels = ['0-20', '21-40', '41-60', '61-80', '81-100']
-        df['confidence_range'] = pd.cut(df['confidence'], bins=bins, labels=labels, right=False)
-        
-        confidence_counts = df['confidence_range'].value_counts().reset_index()
+        # Counted straight from the binned scores, without adding a column to the frame
+        confidence_counts = pd.cut(df['confidence'], bins=bins, labels=labels, right=False).value_counts(sort=False).reset_index()
         confidence_counts.columns = ['Range', 'Count']
-        confidence_counts = confidence_counts.sort_values('Range')
         
         st.bar_chart(confidence_counts.set_index('Range'))
     
     # Date distribution
     if 'date' in df.columns and not df.empty:
         st.subheader("Article Date Distribution")
-        df['date_only'] = df['date'].dt.date
-        date_counts = df.groupby('date_only').size().reset_index()
+        # Grouped by day directly (groupby sorts the days), without adding a column to the frame
+        date_counts = df.groupby(df['date'].dt.date).size().reset_index()
         date_counts.columns = ['Date', 'Count']
-        date_counts = date_counts.sort_values('Date')
         
         st.line_chart(date_counts.set_index('Date'))
 
@@ -130,29 +109,24 @@ with tab2:
         
         # Filter options
         if 'company' in df.columns and not df.empty:
-            companies = ['All'] + sorted(df['company'].unique().tolist())
+            companies = ['All'] + get_company_options_cached(KEPT_ARTICLES_FILE)
             selected_company = st.selectbox("Filter by Company", companies, key="company_filter_kept")
         else:
             selected_company = "All"
         
-        # Apply filter
-        filtered_df = df.copy()
+        # Apply filter (a filtered view, so the frame isn't copied when showing all companies)
+        filtered_df = df
         if selected_company != "All" and 'company' in df.columns:
             filtered_df = filtered_df[filtered_df['company'] == selected_company]
         
         # Display kept articles
         if not filtered_df.empty:
-            # Format dates for display
-            display_df = filtered_df.copy()
-            if 'date' in display_df.columns:
-                display_df['date'] = display_df['date'].dt.strftime("%Y-%m-%d")
-            
             # Define columns for display
             display_columns = ['title', 'company', 'confidence']
             
             # Display as selectable dataframe
             st.dataframe(
-                display_df[display_columns],
+                filtered_df[display_columns],
                 use_container_width=True,
                 column_config={
                     "title": st.column_config.TextColumn("Title"),
@@ -167,39 +141,30 @@ with tab2:
             )
             
             # Select article to add to final collection
-            selected_titles = filtered_df['title'].tolist()
-            selected_title = st.selectbox(
+            # The options are article IDs shown by title, so the selected article is one dict lookup
+            # (rather than matching the title against every row)
+            selected_article_id = st.selectbox(
                 "Select article to add to collection", 
-                options=selected_titles,
+                options=filtered_df['articleID'].tolist(),
+                format_func=lambda article_id: kept_by_id[article_id].get('title', article_id),
                 key="kept_article_selector"
             )
             
-            if selected_title:
+            if selected_article_id:
                 # Find the article
-                selected_row = filtered_df[filtered_df['title'] == selected_title]
-                if 'articleID' in selected_row.columns:
-                    article_id = selected_row['articleID'].iloc[0]
-                    selected_article = next((a for a in kept_articles if a.get('articleID') == article_id), None)
-                else:
-                    # Fallback to index if articleID not available
-                    article_idx = selected_row.index[0]
-                    selected_article = next((a for i, a in enumerate(kept_articles) if i == article_idx), None)
+                selected_article = kept_by_id.get(selected_article_id)
                 
                 if selected_article:
                     # Button to add to final collection
                     if st.button("Add to Final Collection", key="add_to_collection", type="primary"):
                         # Check if already in final collection
-                        existing_ids = [a.get('articleID') for a in final_collection if 'articleID' in a]
-                        
-                        if 'articleID' in selected_article and selected_article['articleID'] in existing_ids:
+                        if 'articleID' in selected_article and selected_article['articleID'] in final_ids:
                             st.warning("This article is already in the final collection.")
                         else:
                             # Add to final collection
                             final_collection.append(selected_article)
                             save_json_file(final_collection, FINAL_COLLECTION_FILE)
                             st.success("Article added to final collection!")
-                            # Reload data
-                            st.cache_data.clear()
                             st.rerun()
         else:
             st.info("No kept articles match your filter criteria.")
@@ -208,17 +173,12 @@ with tab2:
         st.markdown("### Final Collection")
         
         if not final_df.empty:
-            # Format dates for display
-            display_final_df = final_df.copy()
-            if 'date' in display_final_df.columns:
-                display_final_df['date'] = display_final_df['date'].dt.strftime("%Y-%m-%d")
-            
             # Define columns for display
             display_columns = ['title', 'company', 'confidence']
             
             # Display as selectable dataframe
             st.dataframe(
-                display_final_df[display_columns],
+                final_df[display_columns],
                 use_container_width=True,
                 column_config={
                     "title": st.column_config.TextColumn("Title"),
@@ -233,29 +193,25 @@ with tab2:
             )
             
             # Select article to remove from final collection
-            final_titles = display_final_df['title'].tolist()
-            if final_titles:
-                selected_final_title = st.selectbox(
+            # The options are article IDs shown by title (as for the kept articles), so the
+            # selection is the ID itself rather than a title matched against every row
+            if 'articleID' in final_df.columns:
+                final_titles = dict(zip(final_df['articleID'].to_numpy(), final_df['title'].to_numpy()))
+                article_id = st.selectbox(
                     "Select article to remove from collection", 
-                    options=final_titles,
+                    options=list(final_titles),
+                    format_func=lambda article_id: final_titles[article_id],
                     key="final_article_selector"
                 )
                 
-                if selected_final_title:
-                    # Find the article
-                    selected_row = final_df[final_df['title'] == selected_final_title]
-                    if 'articleID' in selected_row.columns:
-                        article_id = selected_row['articleID'].iloc[0]
-                        
-                        # Button to remove from final collection
-                        if st.button("Remove from Final Collection", key="remove_from_collection", type="secondary"):
-                            # Remove from final collection
-                            final_collection = [a for a in final_collection if a.get('articleID') != article_id]
-                            save_json_file(final_collection, FINAL_COLLECTION_FILE)
-                            st.success("Article removed from final collection!")
-                            # Reload data
-                            st.cache_data.clear()
-                            st.rerun()
+                if article_id:
+                    # Button to remove from final collection
+                    if st.button("Remove from Final Collection", key="remove_from_collection", type="secondary"):
+                        # Remove from final collection
+                        final_collection = [a for a in final_collection if a.get('articleID') != article_id]
+                        save_json_file(final_collection, FINAL_COLLECTION_FILE)
+                        st.success("Article removed from final collection!")
+                        st.rerun()
             
             # Export options
             st.markdown("### Export Collection")
@@ -266,18 +222,22 @@ with tab2:
             )
             
             if st.button("Export Collection", key="export_collection", type="primary"):
+                # Export only the articles' own fields (in the order they first appear), not the helper
+                # columns get_articles_df adds to the shared frame
+                export_columns = [c for c in dict.fromkeys(key for article in final_collection for key in article) if c in final_df.columns]
+                export_df = final_df[export_columns]
                 if export_format == "JSON":
                     # Already in JSON format, just display a success message
                     st.success(f"Collection exported to {FINAL_COLLECTION_FILE}")
                 elif export_format == "CSV":
                     # Export to CSV
                     csv_file = "data/final-collection.csv"
-                    final_df.to_csv(csv_file, index=False)
+                    export_df.to_csv(csv_file, index=False)
                     st.success(f"Collection exported to {csv_file}")
                 elif export_format == "Excel":
                     # Export to Excel
                     excel_file = "data/final-collection.xlsx"
-                    final_df.to_excel(excel_file, index=False)
+                    export_df.to_excel(excel_file, index=False)
                     st.success(f"Collection exported to {excel_file}")
         else:
             st.info("No articles in final collection yet. Add some from the kept articles.")
@@ -5,28 +5,14 @@ import sys
 import json
 from datetime import datetime
 
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils import load_json_file, save_json_file
-
-# Page configuration
-st.set_page_config(
-    page_title="prospectorAIDE - Settings",
-    page_icon="⚙️",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
-
-# Load external CSS file
-def load_css(css_file):
-    if os.path.exists(css_file):
-        with open(css_file, "r") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    else:
-        st.warning(f"CSS file not found: {css_file}")
-
-# Load the CSS
-load_css("styles.css")
+# Add parent directory to path to import utils (only once, not on every rerun)
+_parent = os.path.dirname(os.path.dirname(__file__))
+if _parent not in sys.path:
+    sys.path.insert(0, _parent)
+from utils import load_json_file, save_json_file, render_header
+
+# Page configuration and header
+render_header("Settings", "⚙️")
 
 # Add custom CSS for our components
 st.markdown("""
@@ -59,24 +45,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Create a container for logos in the header
-header = st.container()
-with header:
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        # App title
-        st.title("⚙️ Settings", anchor=False)
-    
-    with col2:
-        # Company logo
-        if os.path.exists("assets/CtiPath-logo.png"):
-            st.image("assets/CtiPath-logo.png", width=150)
-        
-    # Add app logo if exists
-    if os.path.exists("assets/prospectorAIDE-logo.png"):
-        st.logo("assets/prospectorAIDE-logo.png", size='large')
-
 st.markdown("Configure application settings and criteria for prospect evaluation.")
 
 # Constants for file paths
@@ -1,40 +1,283 @@
 import json
+import orjson
 import os
 from datetime import datetime
 import time
 import pandas as pd
+import numpy as np
 import boto3
 import streamlit as st
 import requests
+from http_session import get_http_session
 import uuid
+import hashlib
 import re
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from bs4 import BeautifulSoup, SoupStrainer
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Site URLs for the article list scraper
+BASE_URL = 'https://chainstoreage.com'
+NEWS_URL = BASE_URL + '/news'
+
+# Compiled patterns for the article list scraper
+DATE_RE = re.compile(r'"date":"([^"]+)"')
+URL_DATE_RE = re.compile(r'/(\d{4}-\d{2})/')
+JSON_DECODER = json.JSONDecoder()
+
+# orjson options for the data files (indented so they stay readable)
+JSON_FILE_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+# orjson options for JSONL files (one compact item per line)
+JSONL_FILE_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+# Compiled patterns for text cleanup and pulling JSON out of LLM responses
+WHITESPACE_RE = re.compile(r'\s+')
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+FENCED_JSON_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+JSON_OBJECT_RE = re.compile(r'(\{.*\})', re.DOTALL)
+CRITERIA_OBJECT_RE = re.compile(r'(\{[^{}]*"criteria":[^{}]*\})', re.DOTALL)
+
+# Namespace for article UUIDs (the DNS namespace)
+UUID_NAMESPACE_BYTES = uuid.UUID('6ba7b810-9dad-11d1-80b4-00c04fd430c8').bytes
+
+# Number of listing pages fetched concurrently
+PAGE_FETCH_WORKERS = 4
+
+# Number of article batches reviewed by the LLM concurrently
+REVIEW_WORKERS = int(os.getenv('REVIEW_WORKERS', 16))
+
+# Number of articles analyzed concurrently by analyze_all
+ANALYZE_WORKERS = int(os.getenv('ANALYZE_WORKERS', 8))
+
+# Only the tags the listing extractors read (cards, links, dated scripts and
+# the pagination list) are built into the tree when parsing a listing page
+LISTING_STRAINER = SoupStrainer(['div', 'a', 'script', 'ul'])
+
+# App logo shown in the sidebar of every page
+APP_LOGO = "assets/prospectorAIDE-logo.png"
+
+# Company logo shown in the page headers (checked once rather than on every rerun)
+CTIPATH_LOGO = "assets/CtiPath-logo.png"
+HAS_CTIPATH_LOGO = os.path.exists(CTIPATH_LOGO)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_css(css_file, mtime_ns):
+    """Read a CSS file once per file version (the modification time only keys the cache), return None if it doesn't exist."""
+    if not os.path.exists(css_file):
+        return None
+    with open(css_file, "r") as f:
+        return f.read()
+
+def load_css(css_file):
+    """Add the styles from a CSS file to the page."""
+    css = get_css(css_file, file_signature(css_file)[0])
+    if css is None:
+        st.warning(f"CSS file not found: {css_file}")
+    else:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+def render_header(title, icon, page_title=None, heading=None, sidebar="collapsed", css_file="styles.css"):
+    """Set up a page: page config, app logo, CSS and the title/company logo header."""
+    st.set_page_config(
+        page_title=page_title or f"prospectorAIDE - {title}",
+        page_icon=icon,
+        layout="wide",
+        initial_sidebar_state=sidebar
+    )
+    st.logo(APP_LOGO, size='large')
+    
+    # Load the CSS
+    if css_file:
+        load_css(css_file)
+    
+    # Create a container for logos in the header
+    header = st.container()
+    with header:
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            # App title
+            st.title(heading or f"{icon} {title}", anchor=False)
+        
+        with col2:
+            # Company logo
+            if HAS_CTIPATH_LOGO:
+                st.image(CTIPATH_LOGO, width=150)
+
+def load_jsonl_file(file_path):
+    """
+    Load data from a JSONL file (one item per line), return empty list if file doesn't exist.
+    An article can be appended again after it changes, so the last line for an articleID
+    replaces the earlier ones (keeping the position the article first appeared at).
+    """
+    data = []
+    if os.path.exists(file_path):
+        positions = {}
+        with open(file_path, 'rb') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    item = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    print(f"JSON decode error in {file_path}, skipping line")
+                    continue
+                article_id = item.get('articleID') if isinstance(item, dict) else None
+                if article_id in positions:
+                    data[positions[article_id]] = item
+                else:
+                    if article_id is not None:
+                        positions[article_id] = len(data)
+                    data.append(item)
+    return data
 
 def load_json_file(file_path):
-    """Load data from a JSON file, return empty list if file doesn't exist or is empty."""
+    """Load data from a JSON (or JSONL) file, return empty list if file doesn't exist or is empty."""
+    if file_path.endswith('.jsonl'):
+        return load_jsonl_file(file_path)
     if os.path.exists(file_path):
-        with open(file_path, 'r', encoding='utf-8') as file:
+        with open(file_path, 'rb') as file:
             content = file.read().strip()
             if not content:  # File is empty
                 return []
             try:
-                data = json.loads(content)
-                # If loading from the main data file, make sure we have indexes
-                if file_path.endswith('prospects-new.json'):
-                    # Make sure each article has an index for proper dataframe creation
-                    for i, article in enumerate(data):
-                        article['index_pos'] = i
-                return data
-            except json.JSONDecodeError:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
                 print(f"JSON decode error in {file_path}, returning empty list")
                 return []
     return []
 
+def file_signature(file_path):
+    """Return a file's (modification time, size), or (0, 0) if it doesn't exist."""
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return 0, 0
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_articles_index(file_path, mtime_ns, size):
+    """
+    Load an articles file once per file version, returning the list and an articleID index.
+    The same objects are shared by every session and rerun, so callers must not modify them.
+    """
+    articles = load_json_file(file_path)
+    if not (articles and isinstance(articles, list) and 'articleID' in articles[0]):
+        return [], {}
+    articles_by_id = {a['articleID']: a for a in articles if 'articleID' in a}
+    return articles, articles_by_id
+
+# Fields the prospect listings filter, sort and count on (and show in each row's metadata)
+LISTING_FIELDS = ('articleID', 'compatibility', 'company', 'date', 'location')
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_articles_listing(file_path, mtime_ns, size):
+    """
+    Scan a JSONL articles file once per file version, keeping only the listing fields
+    of each article and where its line sits in the file. Returns the listing rows and
+    an {articleID: (offset, length)} index; full articles are read with read_articles.
+    """
+    rows = []
+    positions = {}
+    offsets = {}
+    if not os.path.exists(file_path):
+        return rows, offsets
+    with open(file_path, 'rb') as file:
+        offset = 0
+        for line in file:
+            length = len(line)
+            if line.strip():
+                try:
+                    article = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    print(f"JSON decode error in {file_path}, skipping line")
+                    article = None
+                if isinstance(article, dict) and 'articleID' in article:
+                    article_id = article['articleID']
+                    row = {field: article[field] for field in LISTING_FIELDS if field in article}
+                    # The last line for an articleID wins, at the position it first appeared
+                    if article_id in positions:
+                        rows[positions[article_id]] = row
+                    else:
+                        positions[article_id] = len(rows)
+                        rows.append(row)
+                    offsets[article_id] = (offset, length)
+            offset += length
+    return rows, offsets
+
+def read_articles(file_path, offsets, article_ids):
+    """Read the full articles for some articleIDs from a JSONL file, using the offsets from get_articles_listing."""
+    articles = {}
+    with open(file_path, 'rb') as file:
+        for article_id in article_ids:
+            if article_id in offsets:
+                offset, length = offsets[article_id]
+                file.seek(offset)
+                articles[article_id] = orjson.loads(file.read(length))
+    return articles
+
+def count_articles_cached(file_path):
+    """Count the distinct articles (by articleID) in an articles file, from the loaders' cached index of the current file version."""
+    if file_path.endswith('.jsonl'):
+        # The listing index holds one entry per articleID (the last line for an article wins)
+        return len(get_articles_listing(file_path, *file_signature(file_path))[1])
+    return len(get_articles_index(file_path, *file_signature(file_path))[1])
+
+def write_file_atomic(file_path, payload):
+    """Write bytes to a file through a temporary file and a rename, so readers never see a half-written file."""
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(payload)
+    os.replace(temp_path, file_path)
+
 def save_json_file(data, file_path):
     """Save data to a JSON file."""
-    with open(file_path, 'w') as file:
-        json.dump(data, file, indent=4)
+    write_file_atomic(file_path, orjson.dumps(data, option=JSON_FILE_OPTIONS))
+
+def save_jsonl_append(new_articles, file_path):
+    """Append articles to a JSONL file, one per line, without rewriting the articles already in it."""
+    with open(file_path, 'ab') as file:
+        file.write(b''.join(orjson.dumps(article, option=JSONL_FILE_OPTIONS) + b'\n' for article in new_articles))
+    compact_jsonl_file(file_path)
+
+# Size of the current lines of each JSONL file when it was last checked for compaction
+_jsonl_live_sizes = {}
+
+def compact_jsonl_file(file_path):
+    """
+    Rewrite a JSONL articles file with only the last line for each articleID, once the
+    superseded lines take up as much of the file as the current ones.
+    Returns True if the file was rewritten.
+    """
+    size = os.path.getsize(file_path)
+    # Only rescan the file once it has doubled since the last check
+    if size < 2 * _jsonl_live_sizes.get(file_path, 0):
+        return False
+    rows, offsets = get_articles_listing(file_path, *file_signature(file_path))
+    live_size = sum(length for _, length in offsets.values())
+    _jsonl_live_sizes[file_path] = live_size
+    if size < 2 * live_size:
+        return False
+    # Copy the current lines as they are, in the order the articles first appeared
+    with open(file_path, 'rb') as file:
+        lines = []
+        for offset, length in offsets.values():
+            file.seek(offset)
+            lines.append(file.read(length))
+    write_file_atomic(file_path, b''.join(line if line.endswith(b'\n') else line + b'\n' for line in lines))
+    return True
+
+def import_json_articles(json_path, jsonl_path):
+    """
+    Copy the articles of a JSON array file (the format before JSONL) into a JSONL file,
+    once: only while the JSONL file doesn't exist yet. The JSON file is left as it is.
+    Returns the number of articles imported.
+    """
+    if os.path.exists(jsonl_path) or not os.path.exists(json_path):
+        return 0
+    articles = load_json_file(json_path)
+    write_file_atomic(jsonl_path, b''.join(orjson.dumps(article, option=JSONL_FILE_OPTIONS) + b'\n' for article in articles))
+    return len(articles)
 
 def log_debug_info(message, data=None, log_file="debug_log.txt"):
     """
@@ -303,10 +546,10 @@ def extract_by_text_density(soup):
 def clean_text(text):
     """Clean extracted text"""
     # Replace multiple spaces with a single space
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_RE.sub(' ', text)
     
     # Remove empty lines
-    text = re.sub(r'\n\s*\n', '\n', text)
+    text = BLANK_LINES_RE.sub('\n', text)
     
     # Trim the text
     text = text.strip()
@@ -393,18 +636,18 @@ Article content:
         
         # Try to parse the response as JSON
         try:
-            analysis_data = json.loads(llm_response)
-        except json.JSONDecodeError:
+            analysis_data = orjson.loads(llm_response)
+        except orjson.JSONDecodeError:
             # If direct parsing fails, try to extract JSON from the response
             # Try to find JSON content between code blocks
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', llm_response, re.DOTALL)
+            json_match = FENCED_JSON_RE.search(llm_response)
             if json_match:
-                analysis_data = json.loads(json_match.group(1))
+                analysis_data = orjson.loads(json_match.group(1))
             else:
                 # Try to find just a JSON object anywhere in the text
-                json_match = re.search(r'(\{.*\})', llm_response, re.DOTALL)
+                json_match = JSON_OBJECT_RE.search(llm_response)
                 if json_match:
-                    analysis_data = json.loads(json_match.group(1))
+                    analysis_data = orjson.loads(json_match.group(1))
                 else:
                     # If we still can't find valid JSON, create a simple structure
                     analysis_data = {
@@ -453,16 +696,31 @@ Article content:
         
     return analyzed_article
 
-def analyze_all(articles):
+def analyze_all(articles, on_progress=None):
     """
-    Analyze all articles in the list.
+    Analyze all articles in the list, several at once (each one waits on a page fetch and an LLM call).
+    on_progress, if given, is called with (articles done, total articles) as each analysis finishes.
     """
-    analyzed_articles = []
-    for article in articles:
-        analyzed_article = analyze_article(article)
-        analyzed_articles.append(analyzed_article)
+    if not articles:
+        return []
+    
+    # Create the shared Bedrock client before the worker threads need it
+    get_bedrock_client()
+    analyzed_articles = [None] * len(articles)
+    with ThreadPoolExecutor(max_workers=ANALYZE_WORKERS) as executor:
+        futures = {executor.submit(analyze_article, article): i for i, article in enumerate(articles)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            analyzed_articles[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, len(articles))
     return analyzed_articles
 
+def join_list_value(value):
+    """Join a list value (the LLM can return several companies or locations) into one comma-separated string."""
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    return value
+
 def get_articles_df(articles):
     """Convert articles list to a pandas DataFrame with proper types."""
     if not articles:
@@ -474,93 +732,247 @@ def get_articles_df(articles):
     # Create the DataFrame
     df = pd.DataFrame(articles_copy)
     
+    # Whether each article has been analyzed or mined (stored once here, so filters and counts
+    # don't look it up per rerun)
+    df['is_analyzed'] = [('analysis' in a) for a in articles]
+    df['is_mined'] = [('mined' in a) for a in articles]
+    
     # Set articleID as index if it exists
     if 'articleID' in df.columns:
         df.set_index('articleID', inplace=True, drop=False)
     
-    # Convert date strings to datetime objects
+    # Convert date strings to datetime objects (the dates are ISO 8601, so skip format inference).
+    # Dates with and without a UTC offset are both normalized to naive UTC, so the column
+    # always stays datetime64 instead of falling back to objects.
     if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        df['date'] = pd.to_datetime(df['date'], errors='coerce', format='ISO8601', utc=True).dt.tz_localize(None)
+        # The date as displayed (without the time), formatted once here rather than per rerun
+        df['date_str'] = df['date'].dt.strftime('%Y-%m-%d').fillna('')
     
     if 'analyze_date' in df.columns:
-        df['analyze_date'] = pd.to_datetime(df['analyze_date'], errors='coerce')
+        df['analyze_date'] = pd.to_datetime(df['analyze_date'], errors='coerce', format='ISO8601', utc=True).dt.tz_localize(None)
     
-    # Ensure compatibility is numeric
+    # Ensure compatibility is numeric, stored as a nullable Int16 so a missing score stays
+    # missing (rather than becoming a score of 0) when sorting and filtering
     if 'compatibility' in df.columns:
-        df['compatibility'] = pd.to_numeric(df['compatibility'], errors='coerce')
-        # Fill NaN values with 0
-        df['compatibility'] = df['compatibility'].fillna(0)
+        df['compatibility'] = pd.to_numeric(df['compatibility'], errors='coerce').round().astype('Int16')
+    
+    # Same for the confidence scores of collected articles
+    if 'confidence' in df.columns:
+        df['confidence'] = pd.to_numeric(df['confidence'], errors='coerce').round().astype('Int16')
+    
+    # Few distinct companies and locations, so store them as categoricals (filters and
+    # value counts compare integer codes)
+    # (list values are joined into one string first, since lists can't be categories)
+    if 'company' in df.columns:
+        df['company'] = df['company'].map(join_list_value).astype('category')
+    if 'location' in df.columns:
+        df['location'] = df['location'].map(join_list_value).astype('category')
+    
+    return df
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_articles_df_version(file_path, mtime_ns, size):
+    """Build the articles DataFrame for a file, cached per file version."""
+    return get_articles_df(load_json_file(file_path))
+
+def get_articles_df_cached(file_path):
+    """Build the articles DataFrame for a file, only re-parsing it when the file has changed on disk."""
+    return get_articles_df_version(file_path, *file_signature(file_path))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_company_options_version(file_path, mtime_ns, size):
+    """List the distinct companies in an articles file, sorted, cached per file version."""
+    df = get_articles_df_version(file_path, mtime_ns, size)
+    if 'company' not in df.columns:
+        return []
+    # The categorical column already holds each distinct company once, so the rows aren't scanned
+    if isinstance(df['company'].dtype, pd.CategoricalDtype):
+        return sorted(df['company'].cat.categories.tolist())
+    return sorted(df['company'].dropna().unique().tolist())
+
+def get_company_options_cached(file_path):
+    """List the distinct companies in an articles file, only recomputing them when the file has changed on disk."""
+    return get_company_options_version(file_path, *file_signature(file_path))
+
+def get_articles_soa(articles):
+    """Build a lean frame holding one column per field used to filter, sort, count and list articles."""
+    if not articles:
+        return pd.DataFrame()
+    
+    dates = pd.Series([a.get('date') for a in articles], dtype=object)
+    # Naive UTC, whether or not each date carries an offset (see get_articles_df)
+    parsed_dates = pd.to_datetime(dates, errors='coerce', format='ISO8601', utc=True).dt.tz_localize(None)
+    df = pd.DataFrame({
+        'articleID': np.array([a.get('articleID') for a in articles], dtype=object),
+        'compatibility': pd.to_numeric(pd.Series([a.get('compatibility') for a in articles], dtype=object), errors='coerce').fillna(0).to_numpy(dtype=np.int16),
+        # Categorical, so the sorted company list is just its categories and
+        # company filters compare integer codes
+        'company': pd.Categorical([join_list_value(a.get('company', '')) for a in articles]),
+        'date': parsed_dates,
+        # Calendar day for the day filters, and the date as displayed (without the time)
+        'date_day': parsed_dates.to_numpy().astype('datetime64[D]'),
+        'date_str': dates.str.split('T').str[0],
+        'location': np.array([join_list_value(a.get('location')) or '' for a in articles], dtype=object),
+    })
     
+    # Index by articleID, like get_articles_df
+    df.set_index('articleID', inplace=True, drop=False)
     return df
 
-def keep_article(article, kept_file):
+# Compatibility bands (0-19, 20-39, 40-59, 60-79, 80-100) and their emoji
+COMPATIBILITY_BINS = np.array([20, 40, 60, 80])
+COMPATIBILITY_EMOJI = np.array(["⚫", "🔴", "🟡", "🔵", "🟢"])
+
+def get_compatibility_emoji(compatibility):
+    """Map an array of compatibility scores to their emoji in one binning pass (a missing score shows as the lowest band)."""
+    compatibility = np.nan_to_num(np.asarray(compatibility, dtype=float), nan=0)
+    return COMPATIBILITY_EMOJI[np.searchsorted(COMPATIBILITY_BINS, compatibility, side='right')]
+
+@st.cache_data(show_spinner=False, max_entries=1000)
+def get_article_card_html(title, excerpt, compatibility, formatted_date, company, location, analyze_date, url, compatibility_emoji):
+    """Build an article card's HTML from its field values (None for a missing field), cached per set of values."""
+    # Title
+    parts = [f"<div class='article-title'><strong>{compatibility_emoji} {title}</strong></div>"]
+    
+    # Excerpt
+    if excerpt is not None:
+        parts.append(f"<div class='article-excerpt'>{excerpt}</div>")
+    
+    # Metadata in specified order: compatibility, date, company, location
+    metadata_parts = []
+    
+    # compatibility (bold)
+    if compatibility is not None:
+        metadata_parts.append(f"<strong>Compatibility: {compatibility}%</strong>")
+    
+    # Date
+    if formatted_date is not None:
+        metadata_parts.append(f"<strong>Date:</strong> {formatted_date}")
+    
+    # Company
+    if company:
+        metadata_parts.append(f"<strong>Company:</strong> {company}")
+    
+    # Location
+    if location:
+        metadata_parts.append(f"<strong>Location:</strong> {location}")
+    
+    # Join metadata with pipe separators
+    if metadata_parts:
+        parts.append("<div class='article-metadata'>" + " | ".join(metadata_parts) + "</div>")
+
+    # Show analyze_date if available
+    if analyze_date is not None:
+        parts.append(f"<div class='article-metadata'>Analyzed: {analyze_date}</div>")
+
+    # URL as a link that opens in a new tab
+    if url:
+        parts.append(f"<div class='article-url'><a href='{url}' target='_blank'>{url}</a></div>")
+
+    return "".join(parts)
+
+def get_article_html(article, compatibility_emoji, formatted_date):
+    """Build an article's title, excerpt, metadata and URL as one HTML block, so it is sent to the browser as a single element."""
+    # Only hashable field values are passed to the cached builder, so the key is cheap to hash
+    return get_article_card_html(
+        article.get('title'),
+        article.get('excerpt'),
+        article.get('compatibility'),
+        formatted_date if 'date' in article else None,
+        join_list_value(article.get('company')),
+        join_list_value(article.get('location')),
+        article.get('analyze_date'),
+        article.get('url'),
+        compatibility_emoji
+    )
+
+def get_analysis_html(analysis):
+    """Build an article's analysis fields as one HTML block."""
+    analysis_parts = []
+    if 'analysis_compatibility' in analysis:
+        analysis_parts.append(f"<div class='analysis-item'><strong class='analysis-label'>Compatibility:</strong> {analysis['analysis_compatibility']}%</div>")
+
+    if 'original_compatibility' in analysis:
+        analysis_parts.append(f"<div class='analysis-item'><strong class='analysis-label'>Original Compatibility:</strong> {analysis['original_compatibility']}%</div>")
+
+    if 'analysis_explanation' in analysis:
+        analysis_parts.append(f"<div class='analysis-item'><strong class='analysis-label'>Explanation:</strong> {analysis['analysis_explanation']}</div>")
+    
+    if 'analysis_company' in analysis and analysis['analysis_company']:
+        analysis_parts.append(f"<div class='analysis-item'><strong class='analysis-label'>Company:</strong> {analysis['analysis_company']}</div>")
+    
+    if 'analysis_location' in analysis and analysis['analysis_location']:
+        analysis_parts.append(f"<div class='analysis-item'><strong class='analysis-label'>Location:</strong> {analysis['analysis_location']}</div>")
+    
+    if 'analysis_contact' in analysis and analysis['analysis_contact']:
+        analysis_parts.append(f"<div class='analysis-item'><strong class='analysis-label'>Contact:</strong> {analysis['analysis_contact']}</div>")
+    
+    if 'analysis_summary' in analysis and analysis['analysis_summary']:
+        analysis_parts.append(f"<div class='analysis-item'><strong class='analysis-label'>Project Summary:</strong> {analysis['analysis_summary']}</div>")
+
+    return "".join(analysis_parts)
+
+def merge_kept_articles(articles, kept_file):
     """
-    Save the article to the kept file.
-    Returns True if successful, False otherwise.
+    Add articles to the kept file (replacing any already kept with the same articleID)
+    with one read and one write of the file. Returns the number of articles added
+    (not counting ones that were already kept, or repeated in the list).
     """
-    try:
-        # Ensure the data directory exists
-        os.makedirs(os.path.dirname(kept_file), exist_ok=True)
-        
-        # Load existing kept articles or initialize with empty list if file doesn't exist or is empty
-        if os.path.exists(kept_file):
-            with open(kept_file, 'r') as file:
-                content = file.read().strip()
-                if content:
-                    kept_articles = json.loads(content)
-                else:
-                    kept_articles = []
-        else:
-            kept_articles = []
-            
-        # Check if article is already in kept articles
-        article_ids = [a.get('articleID') for a in kept_articles]
-        if article.get('articleID') in article_ids:
-            # Article already exists, update it
-            for i, kept_article in enumerate(kept_articles):
-                if kept_article.get('articleID') == article.get('articleID'):
-                    kept_articles[i] = article
-                    break
+    # Ensure the data directory exists
+    os.makedirs(os.path.dirname(kept_file), exist_ok=True)
+    
+    # Load existing kept articles or initialize with empty list if file doesn't exist or is empty
+    if os.path.exists(kept_file):
+        with open(kept_file, 'rb') as file:
+            content = file.read().strip()
+            if content:
+                kept_articles = orjson.loads(content)
+            else:
+                kept_articles = []
+    else:
+        kept_articles = []
+    
+    # Update the articles that are already kept, add the new ones
+    positions = {a.get('articleID'): i for i, a in enumerate(kept_articles)}
+    added = 0
+    for article in articles:
+        article_id = article.get('articleID')
+        if article_id in positions:
+            kept_articles[positions[article_id]] = article
         else:
-            # Add new article
+            positions[article_id] = len(kept_articles)
             kept_articles.append(article)
-        
-        # Save back to file
-        with open(kept_file, 'w') as file:
-            json.dump(kept_articles, file, indent=4)
-        return True
-    except Exception as e:
-        print(f"Error keeping article: {e}")
-        return False
+            added += 1
     
+    # Save back to file
+    save_json_file(kept_articles, kept_file)
+    return added
+
 def keep_all_articles(articles, kept_file):
     """
-    Save all articles to the kept file.
-    Returns the number of successfully kept articles.
+    Save all articles to the kept file (in a single write, not one per article).
+    Returns the number of articles added to the kept file, or None if it couldn't be written.
     """
-    successfully_kept = 0
     try:
         print(f"Attempting to keep {len(articles)} articles")
-        # Ensure the data directory exists
-        os.makedirs(os.path.dirname(kept_file), exist_ok=True)
-        
-        # Initialize the file with an empty list if it doesn't exist
-        if not os.path.exists(kept_file):
-            with open(kept_file, 'w') as f:
-                f.write('[]')
-                
-        for article in articles:
-            if keep_article(article, kept_file):
-                successfully_kept += 1
-            else:
-                print(f"Failed to keep article: {article.get('title', 'Unknown')}")
-        
+        successfully_kept = merge_kept_articles(articles, kept_file)
         print(f"Successfully kept {successfully_kept} articles")
         return successfully_kept
     except Exception as e:
         print(f"Error in keep_all_articles: {str(e)}")
-        return 0
+        return None
     
+@st.cache_resource(show_spinner=False)
+def get_bedrock_client():
+    """Create the Bedrock runtime client once (boto3 clients are safe to share across threads)."""
+    return boto3.client(
+        service_name="bedrock-runtime",
+        aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
+        aws_secret_access_key=st.secrets["AWS_SECRET_KEY"],
+        region_name=st.secrets["AWS_REGION"]
+    )
+
 def call_bedrock_llm(
     prompt: str,
     model_name: str = "us.amazon.nova-lite-v1:0",
@@ -574,12 +986,7 @@ def call_bedrock_llm(
     if "Output only json" not in prompt:
         json_prompt = prompt + "\n\nReturn your response in JSON format only, with no additional text."
 
-    client = boto3.client(
-        service_name="bedrock-runtime",
-        aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
-        aws_secret_access_key=st.secrets["AWS_SECRET_KEY"],
-        region_name=st.secrets["AWS_REGION"]
-    )
+    client = get_bedrock_client()
 
     messages = [
         {"role": "user", "content": [{"text": json_prompt}]}
@@ -594,12 +1001,12 @@ def call_bedrock_llm(
         
         # Clean up the response to extract just the JSON part
         # Try to find JSON content between code blocks
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
+        json_match = FENCED_JSON_RE.search(response_text)
         if json_match:
             return json_match.group(1)
         
         # Try to find just a JSON object anywhere in the text
-        json_match = re.search(r'(\{.*\})', response_text, re.DOTALL)
+        json_match = JSON_OBJECT_RE.search(response_text)
         if json_match:
             return json_match.group(1)
         
@@ -645,37 +1052,23 @@ def parse_date(date_string):
     date_string = date_string.strip()
     
     try:
-        # Try ISO format (e.g., "2025-04-30T14:37:11")
+        # ISO format, with or without time or seconds (e.g., "2025-04-30T14:37:11",
+        # "2025-04-30T14:37" or "2025-04-30"), parsed by the C implementation
         return datetime.fromisoformat(date_string)
     except ValueError:
-        try:
-            # Try with variations of ISO format
-            return datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%S")
-        except ValueError:
-            try:
-                # Try without seconds
-                return datetime.strptime(date_string, "%Y-%m-%dT%H:%M")
-            except ValueError:
-                try:
-                    # Try with just the date
-                    return datetime.strptime(date_string, "%Y-%m-%d")
-                except ValueError:
-                    print(f"Could not parse date: {date_string}")
-                    return None
+        print(f"Could not parse date: {date_string}")
+        return None
 
-def fetch_and_parse_chainestoreage(url, parser='html.parser', extract_data=False):
+def fetch_and_parse_chainestoreage(url, parser='lxml', extract_data=False):
     """
     Fetches content from a URL and parses it using BeautifulSoup.
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_session().get(url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, parser)
+        # The full tree is only needed when the caller wants the soup itself
+        soup = BeautifulSoup(response.text, parser, parse_only=LISTING_STRAINER if extract_data else None)
         
         if not extract_data:
             return soup
@@ -693,11 +1086,30 @@ def fetch_and_parse_chainestoreage(url, parser='html.parser', extract_data=False
         print(f"Error fetching or parsing URL: {e}")
         return None
 
+def find_script_date(date_scripts, article_id):
+    """
+    Find the date for an article in the pre-scanned script texts.
+    """
+    if not article_id:
+        return None
+    for script_text in date_scripts:
+        if article_id in script_text:
+            date_match = DATE_RE.search(script_text)
+            return date_match.group(1) if date_match else None
+    return None
+
 def extract_articles_chainstoreage(soup):
     """
     Extracts article information from the page.
     """
     articles = []
+    # Position of each collected title, so the duplicate checks below are dict
+    # lookups and later sources can fill in details for an article already found
+    title_index = {}
+    
+    # Scan the script tags once for the ones that carry dates, rather than
+    # walking every script on the page again for each article
+    date_scripts = [script.string for script in soup.find_all('script') if script.string and '"date":' in script.string]
     
     # Find all article containers - both card and teaser-card classes
     # First: Look for the main larger cards
@@ -711,7 +1123,7 @@ def extract_articles_chainstoreage(soup):
             link = heading.find('a')
             if link:
                 article['title'] = link.text.strip()
-                article['url'] = 'https://chainstoreage.com' + link['href'] if link['href'].startswith('/') else link['href']
+                article['url'] = BASE_URL + link['href'] if link['href'].startswith('/') else link['href']
         
         # Extract excerpt
         body = card.find('div', class_='card__body')
@@ -722,7 +1134,7 @@ def extract_articles_chainstoreage(soup):
         article_url = article.get('url', '')
         if article_url:
             # Extract date from the URL if possible
-            date_match = re.search(r'/(\d{4}-\d{2})/', article_url)
+            date_match = URL_DATE_RE.search(article_url)
             if date_match:
                 year_month = date_match.group(1)
                 # Set an approximate date for the article (first day of month)
@@ -734,17 +1146,16 @@ def extract_articles_chainstoreage(soup):
             article_id = article['url'].split('/')[-1]
         
         # Extract date from article element content if available
-        date_elem = soup.find('script', string=lambda text: text and article_id and article_id in text and '"date":' in text)
-        if date_elem:
-            date_match = re.search(r'"date":"([^"]+)"', date_elem.string)
-            if date_match:
-                article['date'] = date_match.group(1)
+        script_date = find_script_date(date_scripts, article_id)
+        if script_date:
+            article['date'] = script_date
         
         # Special handling for Chipotle article we know about (example)
         if article.get('title') and "Chipotle" in article.get('title') and "Q1" in article.get('title'):
             article['date'] = "2025-04-24T00:00:00"
         
         if article and 'title' in article:
+            title_index[article['title']] = len(articles)
             articles.append(article)
     
     # Second: Look for the teaser cards
@@ -758,7 +1169,7 @@ def extract_articles_chainstoreage(soup):
             link = heading.find_parent('a')
             if link:
                 article['title'] = heading.text.strip()
-                article['url'] = 'https://chainstoreage.com' + link['href'] if link['href'].startswith('/') else link['href']
+                article['url'] = BASE_URL + link['href'] if link['href'].startswith('/') else link['href']
         
         # Extract excerpt
         body = card.find('div', class_='teaser-card__body')
@@ -769,7 +1180,7 @@ def extract_articles_chainstoreage(soup):
         article_url = article.get('url', '')
         if article_url:
             # Extract date from the URL if possible
-            date_match = re.search(r'/(\d{4}-\d{2})/', article_url)
+            date_match = URL_DATE_RE.search(article_url)
             if date_match:
                 year_month = date_match.group(1)
                 # Set an approximate date for the article (first day of month)
@@ -781,13 +1192,12 @@ def extract_articles_chainstoreage(soup):
             article_id = article['url'].split('/')[-1]
         
         # Extract date from article element content if available
-        date_elem = soup.find('script', string=lambda text: text and article_id and article_id in text and '"date":' in text)
-        if date_elem:
-            date_match = re.search(r'"date":"([^"]+)"', date_elem.string)
-            if date_match:
-                article['date'] = date_match.group(1)
+        script_date = find_script_date(date_scripts, article_id)
+        if script_date:
+            article['date'] = script_date
         
-        if article and 'title' in article and not any(a.get('title') == article.get('title') for a in articles):
+        if article and 'title' in article and article['title'] not in title_index:
+            title_index[article['title']] = len(articles)
             articles.append(article)
     
     # Look for articles inside script tags with JSON content
@@ -795,26 +1205,31 @@ def extract_articles_chainstoreage(soup):
     for script in scripts:
         if script.string and '"content":' in script.string and '"items":' in script.string:
             try:
-                content_match = re.search(r'"content":\s*({.+?})(?:,\s*"children":|\s*\})', script.string, re.DOTALL)
-                if content_match:
-                    content_str = content_match.group(1)
-                    content_str = re.sub(r',\s*}', '}', content_str)  # Fix trailing commas
-                    content_obj = json.loads(content_str)
+                # Decode the object that follows "content": in place, instead of
+                # regex-matching it out of the script body and parsing the copy
+                content_start = script.string.find('{', script.string.find('"content":'))
+                if content_start >= 0:
+                    content_obj, _ = JSON_DECODER.raw_decode(script.string, content_start)
                     
                     if 'items' in content_obj:
                         for item in content_obj['items']:
                             # Check if we already have this article
-                            if any(a.get('title') == item.get('title') for a in articles):
+                            if item.get('title') in title_index:
+                                # Fill in a date the card didn't carry
+                                existing = articles[title_index[item['title']]]
+                                if not existing.get('date') and item.get('date'):
+                                    existing['date'] = item['date']
                                 continue
                                 
                             article = {
                                 'title': item.get('title'),
                                 'excerpt': item.get('summary'),
-                                'url': 'https://chainstoreage.com' + item.get('url') if item.get('url', '').startswith('/') else item.get('url'),
+                                'url': BASE_URL + item.get('url') if item.get('url', '').startswith('/') else item.get('url'),
                                 'date': item.get('date')
                             }
                             
                             if article and 'title' in article and article['title']:
+                                title_index[article['title']] = len(articles)
                                 articles.append(article)
             except Exception as e:
                 print(f"Error parsing JSON from script tag: {e}")
@@ -847,7 +1262,7 @@ def extract_pagination_chainstoreage(soup):
         
         if link.text.strip().isdigit():
             page_num = int(link.text.strip())
-            page_url = 'https://chainstoreage.com/news' + link['href'] if link['href'].startswith('?') else link['href']
+            page_url = NEWS_URL + link['href'] if link['href'].startswith('?') else link['href']
             
             pagination['pages'].append({
                 'number': page_num,
@@ -860,7 +1275,7 @@ def extract_pagination_chainstoreage(soup):
         elif 'next' in item.get('class', []):
             if link.text.strip().lower() == 'next':
                 pagination['has_next'] = True
-                pagination['next_url'] = 'https://chainstoreage.com/news' + link['href'] if link['href'].startswith('?') else link['href']
+                pagination['next_url'] = NEWS_URL + link['href'] if link['href'].startswith('?') else link['href']
             elif link.text.strip().lower() == 'last':
                 if 'page=' in link['href']:
                     try:
@@ -871,76 +1286,128 @@ def extract_pagination_chainstoreage(soup):
         elif 'prev' in item.get('class', []):
             if 'disabled' not in item.get('class', []):
                 pagination['has_prev'] = True
-                pagination['prev_url'] = 'https://chainstoreage.com/news' + link['href'] if link['href'].startswith('?') else link['href']
+                pagination['prev_url'] = NEWS_URL + link['href'] if link['href'].startswith('?') else link['href']
     
     return pagination
 
+def add_page_articles(articles, cutoff_date, all_articles):
+    """
+    Adds a page of articles to the collection.
+    Returns True once an article published before the cutoff date is reached.
+    """
+    for article in articles:
+#        print(f"Processing article: {article.get('title', 'Unknown Title')}")
+        
+        # Check if the article has a date
+        article_date = None
+        
+        # Try to get the date from various sources
+        if 'date' in article and article['date']:
+            article_date = parse_date(article['date'])
+        elif 'date_from_url' in article and article['date_from_url']:
+            article_date = parse_date(article['date_from_url'])
+        
+        if article_date:
+#            print(f"Article date: {article_date}")
+            
+            # If the article is before the cutoff date, stop scraping
+            if article_date < cutoff_date:
+                print(f"Reached cutoff date ({article_date} is before {cutoff_date})")
+                # Still add this article to complete the collection
+                all_articles.append(article)
+                return True
+        else:
+            print(f"No date found for article: {article.get('title', 'Unknown Title')}")
+        
+        # Add the article to our collection
+        all_articles.append(article)
+    
+    return False
+
+def process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
+    """
+    Adds the articles from a fetched page to the collection.
+    Returns True when scraping should stop.
+    """
+    if not data:
+        print(f"Failed to fetch or parse page {page_count}")
+        return True
+    
+    articles = data['articles']
+    if not articles:
+        print(f"No articles found on page {page_count}")
+        return True
+    
+#    print(f"Found {len(articles)} articles on page {page_count}")
+    
+    # If we've reached the cutoff, stop scraping
+    return add_page_articles(articles, cutoff_date, all_articles)
+
+def build_page_url(url, page_number):
+    """
+    Returns the URL with its 'page' query parameter set to page_number.
+    """
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query))
+    query['page'] = str(page_number)
+    return urlunparse(parts._replace(query=urlencode(query)))
+
 def scrape_articles_chainstoreage(start_url, cutoff_date):
     """
     Scrapes articles until finding one published before the cutoff date.
     """
     all_articles = []
-    current_url = start_url
     page_count = 1
-    reached_cutoff = False
     
-    while current_url and not reached_cutoff:
-#        print(f"Scraping page {page_count}: {current_url}")
-        
-        data = fetch_and_parse_chainestoreage(current_url, extract_data=True)
-        if not data:
-            print(f"Failed to fetch or parse page {page_count}")
-            break
-            
-        articles = data['articles']
-        pagination = data['pagination']
+#    print(f"Scraping page {page_count}: {start_url}")
+    data = fetch_and_parse_chainestoreage(start_url, extract_data=True)
+    if process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
+        return all_articles
+    
+    pagination = data['pagination']
+    if not (pagination['has_next'] and pagination['next_url']):
+        print("No more pages to scrape.")
+        return all_articles
+    
+    # When the last page is known, fetch the following pages a window at a time
+    # on a thread pool so their round trips overlap. The pages are still added
+    # in order, and nothing past the window holding the cutoff is requested.
+    next_page = dict(parse_qsl(urlparse(pagination['next_url']).query)).get('page', '')
+    if pagination['total_pages'] and next_page.isdigit():
+        page_urls = [build_page_url(pagination['next_url'], page_number)
+                     for page_number in range(int(next_page), pagination['total_pages'] + 1)]
+        with ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS) as executor:
+            for start in range(0, len(page_urls), PAGE_FETCH_WORKERS):
+                window = page_urls[start:start + PAGE_FETCH_WORKERS]
+                pages = executor.map(lambda url: fetch_and_parse_chainestoreage(url, extract_data=True), window)
+                for data in pages:
+                    page_count += 1
+                    if process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
+                        return all_articles
+                
+                # Add a delay between windows to be respectful to the server
+                time.sleep(1)
         
-        if not articles:
-            print(f"No articles found on page {page_count}")
-            break
-            
-#        print(f"Found {len(articles)} articles on page {page_count}")
+        print("No more pages to scrape.")
+        return all_articles
+    
+    # Otherwise follow the next page links one at a time
+    current_url = pagination['next_url']
+    while current_url:
+        page_count += 1
         
-        # Process articles on this page
-        for article in articles:
-#            print(f"Processing article: {article.get('title', 'Unknown Title')}")
-            
-            # Check if the article has a date
-            article_date = None
-            
-            # Try to get the date from various sources
-            if 'date' in article and article['date']:
-                article_date = parse_date(article['date'])
-            elif 'date_from_url' in article and article['date_from_url']:
-                article_date = parse_date(article['date_from_url'])
-            
-            if article_date:
-#                print(f"Article date: {article_date}")
-                
-                # If the article is before the cutoff date, stop scraping
-                if article_date < cutoff_date:
-                    print(f"Reached cutoff date ({article_date} is before {cutoff_date})")
-                    reached_cutoff = True
-                    # Still add this article to complete the collection
-                    all_articles.append(article)
-                    break
-            else:
-                print(f"No date found for article: {article.get('title', 'Unknown Title')}")
-            
-            # Add the article to our collection
-            all_articles.append(article)
+        # Add a delay to be respectful to the server
+        time.sleep(1)
         
-        # If we've reached the cutoff, stop scraping
-        if reached_cutoff:
+#        print(f"Scraping page {page_count}: {current_url}")
+        data = fetch_and_parse_chainestoreage(current_url, extract_data=True)
+        if process_page_chainstoreage(data, page_count, cutoff_date, all_articles):
             break
         
         # Get the next page URL from pagination
+        pagination = data['pagination']
         if pagination['has_next'] and pagination['next_url']:
             current_url = pagination['next_url']
-            page_count += 1
-            
-            # Add a delay to be respectful to the server
-            time.sleep(1)
         else:
             print("No more pages to scrape.")
             current_url = None
@@ -952,14 +1419,107 @@ def generate_deterministic_uuid(url):
     Generate a deterministic UUID based on the article URL.
     This ensures the same article always gets the same UUID.
     """
-    # Create a UUID namespace (using the DNS namespace)
-    namespace = uuid.UUID('6ba7b810-9dad-11d1-80b4-00c04fd430c8')
+    # Same result as uuid.uuid5(NAMESPACE_DNS, url), hashing directly against
+    # the pre-computed namespace bytes
+    digest = bytearray(hashlib.sha1(UUID_NAMESPACE_BYTES + url.encode('utf-8')).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50
+    digest[8] = (digest[8] & 0x3F) | 0x80
+    return str(uuid.UUID(bytes=bytes(digest)))
+
+
+def review_batch(batch, criteria_list, batch_number):
+    """
+    Score one batch of articles against the criteria with the LLM.
+    Returns the reviewed articles for the batch.
+    """
+    batch_results = []
+    
+    print(f"Processing batch {batch_number} with {len(batch)} articles")
     
-    # Create a UUID from the URL
-    return str(uuid.uuid5(namespace, url))
+    prompt = f"""Examine the article json information provided. Determine how well the information in the article matches the following criteria:
+
+Criteria:
+{criteria_list}
+
+Create a "compatibility" score of 0 (does not match criteria) to 100 (matches criteria well) based on how well the information in the article matches the criteria. [compatibility]
+
+For each article, determine the fields "company" and "location" if available in the title and/or excerpt. If not available, leave those fields blank.
+
+Output ONLY a valid JSON array containing objects with these fields for each article: articleID, title, excerpt, company, location, url, date, compatibility.
 
+IMPORTANT: Your response MUST be wrapped in square brackets as a valid JSON array like this:
+[
+  {{
+    "articleID": "value",
+    "title": "value",
+    "excerpt": "value",
+    "url": "value",
+    "date": "value",
+    "company": "value",
+    "location": "value",
+    "compatibility": number
+  }},
+  ...more objects...
+]
 
-def review_articles(articles):
+Article json information:
+{orjson.dumps(batch, option=JSON_FILE_OPTIONS).decode()}"""
+
+    llm_response = call_bedrock_llm(prompt)
+
+#        print(f"--- Batch {batch_number} results ---")
+#        print(llm_response)
+#        print("---")
+    
+    # Process the response for this batch (same error handling as before)
+    try:
+        # Try to parse as is first
+        parsed_json = orjson.loads(llm_response)
+        batch_results.extend(parsed_json)
+    except orjson.JSONDecodeError:
+        try:
+            # Check if it starts with a curly brace (object) instead of a bracket (array)
+            if llm_response.strip().startswith('{'):
+                # Wrap the response in square brackets to make it a valid JSON array
+                wrapped_response = '[' + llm_response + ']'
+                
+                # Try to parse the wrapped response
+                parsed_json = orjson.loads(wrapped_response)
+                batch_results.extend(parsed_json)
+            else:
+                # Try to fix common JSON formatting issues
+                # Remove any text before the first { and after the last }
+                matches = JSON_OBJECT_RE.findall(llm_response)
+                
+                if matches:
+                    # Join all matches with commas and wrap in brackets
+                    fixed_json = '[' + ','.join(matches) + ']'
+                    parsed_json = orjson.loads(fixed_json)
+                    batch_results.extend(parsed_json)
+                else:
+                    raise Exception("Could not find valid JSON objects in response")
+        
+        except Exception as e:
+            print(f"Error fixing JSON in batch {batch_number}: {e}")
+            
+            # Fall back to default handling as in your original code
+            for article in batch:
+                modified_article = article.copy()
+                if 'compatibility' not in modified_article:
+                    modified_article['compatibility'] = 0
+                if 'company' not in modified_article:
+                    modified_article['company'] = ""
+                if 'location' not in modified_article:
+                    modified_article['location'] = ""
+                batch_results.append(modified_article)
+    
+    return batch_results
+
+def review_articles(articles, on_progress=None):
+    """
+    Review articles against the criteria in batches, calling the LLM for several batches at once.
+    on_progress, if given, is called with (batches done, total batches) as each batch finishes.
+    """
     # Calculate optimal batch size (max 10)
     total_articles = len(articles)
     max_batch_size = 10
@@ -1001,95 +1561,23 @@ def review_articles(articles):
 
     print(f"Processing {total_articles} articles in {num_batches} batches of approximately {batch_size} articles each")
     
-    all_results = []
-    
     # Create evenly sized batches
-    for i in range(0, total_articles, batch_size):
-        # Make sure we don't go past the end of the list
-        end_idx = min(i + batch_size, total_articles)
-        batch = articles[i:end_idx]
-        
-        print(f"Processing batch {i//batch_size + 1}/{num_batches} with {len(batch)} articles")
-        
-        prompt = f"""Examine the article json information provided. Determine how well the information in the article matches the following criteria:
-
-Criteria:
-{criteria_list}
-
-Create a "compatibility" score of 0 (does not match criteria) to 100 (matches criteria well) based on how well the information in the article matches the criteria. [compatibility]
-
-For each article, determine the fields "company" and "location" if available in the title and/or excerpt. If not available, leave those fields blank.
-
-Output ONLY a valid JSON array containing objects with these fields for each article: articleID, title, excerpt, company, location, url, date, compatibility.
-
-IMPORTANT: Your response MUST be wrapped in square brackets as a valid JSON array like this:
-[
-  {{
-    "articleID": "value",
-    "title": "value",
-    "excerpt": "value",
-    "url": "value",
-    "date": "value",
-    "company": "value",
-    "location": "value",
-    "compatibility": number
-  }},
-  ...more objects...
-]
-
-Article json information:
-{json.dumps(batch, indent=2)}"""
-
-        llm_response = call_bedrock_llm(prompt)
-
-#        print(f"--- Batch {i//batch_size + 1} results ---")
-#        print(llm_response)
-#        print("---")
-        
-        # Process the response for this batch (same error handling as before)
-        try:
-            # Try to parse as is first
-            parsed_json = json.loads(llm_response)
-            all_results.extend(parsed_json)
-        except json.JSONDecodeError:
-            try:
-                # Check if it starts with a curly brace (object) instead of a bracket (array)
-                if llm_response.strip().startswith('{'):
-                    # Wrap the response in square brackets to make it a valid JSON array
-                    wrapped_response = '[' + llm_response + ']'
-                    
-                    # Try to parse the wrapped response
-                    parsed_json = json.loads(wrapped_response)
-                    all_results.extend(parsed_json)
-                else:
-                    # Try to fix common JSON formatting issues
-                    # Remove any text before the first { and after the last }
-                    import re
-                    json_pattern = r'(\{.*\})'
-                    matches = re.findall(json_pattern, llm_response, re.DOTALL)
-                    
-                    if matches:
-                        # Join all matches with commas and wrap in brackets
-                        fixed_json = '[' + ','.join(matches) + ']'
-                        parsed_json = json.loads(fixed_json)
-                        all_results.extend(parsed_json)
-                    else:
-                        raise Exception("Could not find valid JSON objects in response")
-            
-            except Exception as e:
-                print(f"Error fixing JSON in batch {i//batch_size + 1}: {e}")
-                
-                # Fall back to default handling as in your original code
-                for article in batch:
-                    modified_article = article.copy()
-                    if 'compatibility' not in modified_article:
-                        modified_article['compatibility'] = 0
-                    if 'company' not in modified_article:
-                        modified_article['company'] = ""
-                    if 'location' not in modified_article:
-                        modified_article['location'] = ""
-                    all_results.append(modified_article)
+    batches = [articles[i:min(i + batch_size, total_articles)] for i in range(0, total_articles, batch_size)]
     
+    # The LLM calls are I/O bound, so review the batches on a thread pool. Results are
+    # collected per batch and joined in the original order.
+    get_bedrock_client()
+    batch_results = [None] * len(batches)
+    with ThreadPoolExecutor(max_workers=REVIEW_WORKERS) as executor:
+        futures = {executor.submit(review_batch, batch, criteria_list, number + 1): number for number, batch in enumerate(batches)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            batch_results[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, len(batches))
+    
+    all_results = []
+    for results in batch_results:
+        all_results.extend(results)
     return all_results
             
 def find_articles_chainstoreage(START_URL, CUTOFF_DATE):
@@ -1216,7 +1704,7 @@ Output only json as listed above. Return your response in JSON format only, with
         try:
             # First, check if the response is a valid JSON array
             if llm_response.strip().startswith('[') and llm_response.strip().endswith(']'):
-                criteria_data = json.loads(llm_response)
+                criteria_data = orjson.loads(llm_response)
             else:
                 # If we get fragments of JSON objects without array brackets, fix it
                 fixed_response = llm_response.strip()
@@ -1234,26 +1722,25 @@ Output only json as listed above. Return your response in JSON format only, with
                         fixed_response = fixed_response + ']'
                 
                 try:
-                    criteria_data = json.loads(fixed_response)
-                except json.JSONDecodeError:
+                    criteria_data = orjson.loads(fixed_response)
+                except orjson.JSONDecodeError:
                     # If that failed, try more aggressive fixes
                     # Extract just the objects
-                    pattern = r'(\{[^{}]*"criteria":[^{}]*\})'
-                    matches = re.findall(pattern, fixed_response, re.DOTALL)
+                    matches = CRITERIA_OBJECT_RE.findall(fixed_response)
                     
                     if matches:
                         try:
                             # Join them with commas and wrap in brackets
                             fixed_json = '[' + ','.join(matches) + ']'
-                            criteria_data = json.loads(fixed_json)
-                        except json.JSONDecodeError:
+                            criteria_data = orjson.loads(fixed_json)
+                        except orjson.JSONDecodeError:
                             # Handle individual objects one by one
                             criteria_data = []
                             for obj_str in matches:
                                 try:
-                                    obj = json.loads(obj_str)
+                                    obj = orjson.loads(obj_str)
                                     criteria_data.append(obj)
-                                except json.JSONDecodeError:
+                                except orjson.JSONDecodeError:
                                     # Skip invalid objects
                                     continue
         except Exception as e:
@@ -1265,14 +1752,15 @@ Output only json as listed above. Return your response in JSON format only, with
 
         # Check if we got valid criteria data and store in criteria.json file
         if criteria_data and isinstance(criteria_data, list):
-            # Get unique criteria by removing duplicates
-            existing_criteria_texts = [item['criteria'] for item in existing_criteria]
+            # Get unique criteria by removing duplicates (a set, so each check is one lookup)
+            existing_criteria_texts = {item['criteria'] for item in existing_criteria}
             
             # Only add new criteria that don't already exist
             new_criteria_added = False
             for criteria_item in criteria_data:
                 if criteria_item.get('criteria') and criteria_item['criteria'] not in existing_criteria_texts:
                     existing_criteria.append(criteria_item)
+                    existing_criteria_texts.add(criteria_item['criteria'])
                     new_criteria_added = True
             
             # Save back to file if new criteria were added